@@ -1,52 +0,0 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-import datetime
-import random
-
-# --------------------------------
-# 기본 설정
-# --------------------------------
-st.set_page_config(page_title="🚽 스마트 화장실 AI 시스템", page_icon="💩", layout="wide")
-st.title("🚽 스마트 화장실 AI 헬스케어 시스템")
-st.caption("센서 데이터 기반 💩💧 건강 분석 & 사용자 보상 시스템")
-
-# --------------------------------
-# 메뉴
-# --------------------------------
-menu = st.sidebar.radio(
-    "메뉴 선택",
-    ["1️⃣ 프로필 등록", "2️⃣ 실시간 센서 데이터 분석", "3️⃣ 화장실 방문 기록", "4️⃣ 건강 추이 리포트", "5️⃣ 뱃지 & 보상 시스템"]
-)
-
-# --------------------------------
-# 1️⃣ 프로필 등록
-# --------------------------------
-if menu == "1️⃣ 프로필 등록":
-    st.header("👤 사용자 프로필")
-
-    with st.form("profile_form"):
-        nickname = st.text_input("닉네임")
-        age = st.number_input("나이", 1, 120)
-        sex = st.selectbox("성별", ["남성", "여성", "기타"])
-        health_notes = st.text_area("건강 특이사항")
-        submitted = st.form_submit_button("저장")
-
-    if submitted:
-        st.session_state["profile"] = {
-            "닉네임": nickname, "나이": age, "성별": sex, "건강정보": health_notes
-        }
-        st.success(f"✅ {nickname}님의 프로필이 등록되었습니다!")
-
-# --------------------------------
-# 2️⃣ 실시간 센서 데이터 분석
-# --------------------------------
-elif menu == "2️⃣ 실시간 센서 데이터 분석":
-    st.header("🧪 변기 내 센서 데이터 기반 AI 분석")
-
-    st.write("아래는 변기 생화학 센서로부터 수집된 데이터 예시입니다:")
-
-    # 센서 데이터 시뮬레이션
-    sensor_data = {
-        "pH": round(random.uniform(5.0, 8.0), 2),
-        "단백질": round(random.uniform(0,
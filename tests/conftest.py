@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# toilet_app.db opens its database and archive at import time, so point them at a scratch
+# directory before any test module imports it; always, so an exported TOILET_DB_PATH never
+# sends the tests (which archive visits) to a real database
+_tmp = tempfile.mkdtemp(prefix="toilet_test_")
+os.environ["TOILET_DB_PATH"] = os.path.join(_tmp, "toilet_health.db")
+os.environ["TOILET_ARCHIVE_DIR"] = os.path.join(_tmp, "archive")
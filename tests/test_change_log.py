@@ -0,0 +1,39 @@
+from toilet_app import db
+from toilet_app.cache import query_cache
+
+
+def _external_visit(user_id):
+    # what another process (toilet_app.ingest) does: write + change_log, no local invalidation
+    _, rows = db._visit_rows([(user_id, {"ph": 6.5, "protein": 0.1, "glucose": 0.1, "color_score": 3, "temp": 36.5})])
+    db.pool.write(lambda c: db._insert_visit_rows(c, rows))
+
+
+def test_sync_invalidates_external_writes():
+    user_id = db.create_user("sync", 30, "선택안함", ["특이사항 없음"])
+    db.sync_external_writes()
+    assert db.count_visits(user_id) == 0
+    _external_visit(user_id)
+    db.sync_external_writes()
+    assert db.count_visits(user_id) == 1
+
+
+def test_sync_after_pruned_changes_drops_cache(monkeypatch):
+    user_id = db.create_user("pruned", 30, "선택안함", ["특이사항 없음"])
+    db.sync_external_writes()
+    assert db.count_visits(user_id) == 0
+    _external_visit(user_id)
+    for _ in range(3):
+        db.create_user("other", 30, "선택안함", ["특이사항 없음"])
+    monkeypatch.setattr(db, "CHANGE_LOG_KEEP", 1)
+    db.prune_change_log()
+    db.sync_external_writes()
+    assert db.count_visits(user_id) == 1
+
+
+def test_clear_discards_inflight_load():
+    def loader():
+        query_cache.clear()  # e.g. sync_external_writes on another session's thread
+        return "stale"
+
+    assert query_cache.get_or_load(("test", ""), "k", loader) == "stale"
+    assert query_cache.get_or_load(("test", ""), "k", lambda: "fresh") == "fresh"
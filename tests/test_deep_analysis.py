@@ -0,0 +1,11 @@
+from toilet_app import db, deep_analysis
+
+
+def test_threshold_readings_match_report_code():
+    # readings exactly on the thresholds are "normal" in report_code and must stay so in the
+    # cached frame the analyzer reads (float32(0.6) > 0.6)
+    user_id = db.create_user("threshold", 30, "선택안함", ["특이사항 없음"])
+    db.log_visits([(user_id, {"ph": 7.0, "protein": 0.6, "glucose": 0.4, "color_score": 0.1, "temp": 36.5})])
+    latest = db.get_latest_visit(user_id)
+    assert latest["report_code"] == 0
+    assert deep_analysis.simulated_analyzer(latest.to_dict(), lambda p: None) == ["심층 이상 없음 — 현재 상태 유지 권고."]
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from toilet_app import archive, db, shard
+
+
+def _scores(user_id):
+    with db.pool.reader() as c:
+        hot = c.execute(
+            "SELECT visit_id, stool_score, report_code FROM visits WHERE user_id=? ORDER BY visit_id", (user_id,)
+        ).fetchall()
+    cold = archive.read_columns(user_id, ["visit_id", "stool_score", "report_code"])
+    return hot, {k: np.asarray(v).tolist() for k, v in cold.items()}
+
+
+def test_rescore_covers_visits_of_unregistered_users():
+    # ingest accepts any user_id, so visits can exist without a users row
+    user_id = "unregistered-rescore"
+    now = datetime.utcnow()
+    reading = {"ph": 6.0, "protein": 0.7, "glucose": 0.5, "color_score": 0.3, "temp": 36.5}
+    db.log_visits([
+        (user_id, dict(reading, timestamp=(now - timedelta(days=d)).strftime(db.TS_FORMAT)))
+        for d in (400, 380, 10, 5)
+    ])
+    db.archive_cold_visits(older_than_days=200)
+    expected = _scores(user_id)
+    assert expected[0] and expected[1]["visit_id"]
+
+    # scores from an older rule set, hot and archived
+    db.pool.write(lambda c: c.execute("UPDATE visits SET stool_score=0, report_code=0 WHERE user_id=?", (user_id,)))
+    for month in archive.list_partitions(user_id):
+        part = {k: np.array(v) for k, v in archive.read_partition(user_id, month, list(archive.COLUMN_DTYPES)).items()}
+        part["stool_score"][:] = 0
+        part["report_code"][:] = 0
+        archive.write_partition(user_id, month, part, merge=False)
+    assert _scores(user_id) != expected
+
+    shard.rescore(workers=1)
+    assert _scores(user_id) == expected
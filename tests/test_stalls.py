@@ -0,0 +1,72 @@
+import numpy as np
+
+from toilet_app.stalls import BUCKET, FIELDS, VISITS, WINDOW, StallTracker, WindowCounter
+
+N = WINDOW // BUCKET
+
+
+def _one():
+    values = np.zeros(FIELDS, dtype=np.int64)
+    values[VISITS] = 1
+    return values
+
+
+def _visits(counter, b):
+    counter.advance(b)
+    return int(counter.total[VISITS])
+
+
+def test_bucket_leaves_window_exactly_once():
+    counter = WindowCounter()
+    counter.add(100, _one())
+    assert _visits(counter, 100 + N - 1) == 1
+    assert _visits(counter, 100 + N) == 0
+
+
+def test_expiry_across_bucket_gaps():
+    counter = WindowCounter()
+    for b in (10, 11, 15, 40):
+        counter.add(b, _one())
+    # jump part of the way: only buckets 10 and 11 fall out
+    assert _visits(counter, 11 + N) == 2
+    # jump further than a whole window: everything is cleared, including slots never visited
+    assert _visits(counter, 40 + 3 * N) == 0
+    assert not counter.rows.any()
+    counter.add(40 + 3 * N, _one())
+    assert _visits(counter, 40 + 4 * N - 1) == 1
+
+
+def test_total_matches_brute_force_with_gaps():
+    rng = np.random.default_rng(3)
+    counter = WindowCounter()
+    added = []
+    b = 0
+    for _ in range(2000):
+        # mostly small steps, sometimes gaps longer than the window
+        b += int(rng.choice([0, 1, 2, 5, N - 1, N, 2 * N]))
+        counter.add(b, _one())
+        added.append(b)
+        assert counter.total[VISITS] == sum(1 for x in added if x > b - N)
+
+
+def test_late_event_outside_window_is_dropped():
+    counter = WindowCounter()
+    counter.add(500, _one())
+    counter.add(500 - N, _one())
+    counter.add(500 - N + 1, _one())
+    assert _visits(counter, 500) == 2
+
+
+def test_tracker_window_expiry():
+    tracker = StallTracker()
+    t0 = 1_700_000_000
+    for gap in (0, 600, 5000):
+        t = t0 + gap
+        tracker.observe("enter", "a", t, floor="1F")
+        tracker.observe("flush", "a", t + 30)
+        tracker.observe("exit", "a", t + 90)
+    now = t0 + 5000 + 90
+    assert tracker.stats(now)["visits"] == 1
+    assert tracker.stats(now, floor="1F")["flushed"] == 1
+    assert tracker.stats(now + WINDOW, toilet_id="a")["visits"] == 0
+    assert tracker.stats(now + WINDOW)["occupied"] == 0
@@ -0,0 +1,58 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from toilet_app import archive
+from toilet_app.db import TS_FORMAT, archive_cold_visits, create_user, get_visit_page, log_visits
+
+
+def _reading(ts, rng):
+    return {
+        "ph": rng.uniform(5.0, 8.0),
+        "protein": rng.uniform(0.0, 30.0),
+        "glucose": rng.uniform(0.0, 15.0),
+        "color_score": rng.randint(1, 10),
+        "temp": rng.uniform(36.0, 37.5),
+        "timestamp": ts.strftime(TS_FORMAT),
+    }
+
+
+@pytest.fixture
+def user():
+    # ~14 months of visits, several sharing a timestamp so the visit_id tie-break is exercised
+    rng = random.Random(7)
+    user_id = create_user("paging", 30, "선택안함", ["특이사항 없음"])
+    now = datetime.utcnow().replace(microsecond=0)
+    items = []
+    for day in range(420, 0, -3):
+        ts = now - timedelta(days=day, hours=rng.randint(0, 23))
+        items += [(user_id, _reading(ts, rng)) for _ in range(rng.choice([1, 1, 2, 3]))]
+    visit_ids = log_visits(items, award_badges=False)
+    history = sorted((r["timestamp"], v) for v, (_, r) in zip(visit_ids, items))
+    return user_id, history
+
+
+def _walk(user_id, limit, newest_first):
+    seen, after = [], None
+    while True:
+        df, after = get_visit_page(user_id, ["stool_score"], after=after, limit=limit, newest_first=newest_first)
+        seen += [(ts.strftime(TS_FORMAT), v) for ts, v in zip(df["timestamp"], df["visit_id"])]
+        if after is None:
+            return seen
+
+
+@pytest.mark.parametrize("limit", [1, 7, 25, 1000])
+def test_paging_matches_sorted_history(user, limit):
+    user_id, history = user
+    assert _walk(user_id, limit, newest_first=False) == history
+    assert _walk(user_id, limit, newest_first=True) == history[::-1]
+
+
+@pytest.mark.parametrize("limit", [1, 7, 25, 1000])
+def test_paging_across_archive(user, limit):
+    user_id, history = user
+    assert archive_cold_visits(older_than_days=200) > 0
+    assert archive.bounds(user_id) is not None
+    assert _walk(user_id, limit, newest_first=False) == history
+    assert _walk(user_id, limit, newest_first=True) == history[::-1]
@@ -0,0 +1,2 @@
+# 스마트 화장실 헬스케어 앱 (Streamlit)
+# run with: streamlit run main.py
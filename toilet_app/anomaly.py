@@ -0,0 +1,89 @@
+import json
+import math
+
+# ---------------------------
+# Per-user anomaly detection
+# ---------------------------
+# each user keeps an EWMA mean/variance per sensor; a reading is flagged when it deviates
+# from that personal baseline by more than Z_THRESHOLD standard deviations. the update is
+# O(1) in time and memory per reading and runs inside the visit insert transaction.
+
+ALPHA = 0.1
+Z_THRESHOLD = 3.5
+WARMUP = 5
+
+# metric: (direction, std floor, message); direction +1 = only rises matter, 0 = both ways
+METRICS = {
+    "ph": (0, 0.15, "pH가 평소와 크게 다릅니다"),
+    "protein": (1, 0.05, "단백질 수치가 평소보다 급상승했습니다"),
+    "glucose": (1, 0.05, "당 수치가 평소보다 급상승했습니다"),
+    "color_score": (1, 0.05, "색상 이상도 급상승 (붉은빛 의심)"),
+    "temp": (0, 0.15, "온도가 평소와 크게 다릅니다"),
+}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS anomaly_state (
+        user_id TEXT PRIMARY KEY,
+        state TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS alerts (
+        visit_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        value REAL,
+        baseline REAL,
+        z REAL,
+        message TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_alerts_user_ts ON alerts(user_id, timestamp)",
+]
+
+
+def initial_state():
+    # per metric: [mean, var, n]
+    return {m: [0.0, 0.0, 0] for m in METRICS}
+
+
+def observe(state, reading):
+    # updates state in place; returns [(metric, value, baseline, z, message)] for flagged sensors
+    flags = []
+    for metric, (direction, std_floor, message) in METRICS.items():
+        x = reading[metric]
+        mean, var, n = state[metric]
+        if n == 0:
+            state[metric] = [float(x), 0.0, 1]
+            continue
+        if n >= WARMUP:
+            z = (x - mean) / max(math.sqrt(var), std_floor)
+            if (z if direction > 0 else abs(z)) >= Z_THRESHOLD:
+                flags.append((metric, x, mean, z, message))
+        diff = x - mean
+        incr = ALPHA * diff
+        state[metric] = [mean + incr, (1 - ALPHA) * (var + diff * incr), n + 1]
+    return flags
+
+
+def update(c, visits):
+    # visits: dicts (visit_id, user_id, timestamp, sensors) inserted in this transaction;
+    # returns the user_ids that got new alerts
+    by_user = {}
+    for v in visits:
+        by_user.setdefault(v["user_id"], []).append(v)
+    alerted = set()
+    alert_rows = []
+    for user_id, new in by_user.items():
+        row = c.execute("SELECT state FROM anomaly_state WHERE user_id=?", (user_id,)).fetchone()
+        state = json.loads(row[0]) if row else initial_state()
+        for v in sorted(new, key=lambda v: v["timestamp"]):
+            for metric, value, baseline, z, message in observe(state, v):
+                alert_rows.append((v["visit_id"], user_id, v["timestamp"], metric, value, baseline, z, message))
+                alerted.add(user_id)
+        c.execute(
+            "INSERT INTO anomaly_state (user_id, state) VALUES (?,?) "
+            "ON CONFLICT(user_id) DO UPDATE SET state=excluded.state",
+            (user_id, json.dumps(state)),
+        )
+    if alert_rows:
+        c.executemany("INSERT INTO alerts VALUES (?,?,?,?,?,?,?,?)", alert_rows)
+    return alerted
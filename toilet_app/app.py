@@ -0,0 +1,27 @@
+import streamlit as st
+
+from . import perf
+from .registry import PAGES, PAGES_BY_KEY
+
+
+def main():
+    # -----------------------------
+    # 기본 설정
+    # -----------------------------
+    st.set_page_config(page_title="💩 스마트 화장실 헬스케어", page_icon="🚽", layout="wide")
+    st.title("🚽 스마트 화장실 헬스케어 앱")
+    st.caption("당신의 💩은 건강의 거울입니다.")
+
+    # -----------------------------
+    # 메뉴 (선택된 페이지 모듈만 import)
+    # -----------------------------
+    key = st.sidebar.radio(
+        "메뉴를 선택하세요",
+        [p.key for p in PAGES],
+        format_func=lambda k: PAGES_BY_KEY[k].label,
+    )
+    with perf.timer("rerun"), perf.timer(f"page.{key}"):
+        PAGES_BY_KEY[key].render()
+
+    st.divider()
+    st.caption("© 2025 CleanToilet AI Healthcare System")
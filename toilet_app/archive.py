@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .scoring import REPORT_KEYS, report_codes
+
+# ---------------------------
+# Columnar visit archive
+# ---------------------------
+# cold visits move out of SQLite into one directory per (user, month):
+#
+#   <ARCHIVE_DIR>/<user_id>/<YYYY-MM>/<column>.npy   typed column, read with mmap (zero-copy)
+#   <ARCHIVE_DIR>/<user_id>/<YYYY-MM>/meta.json      {"n", "first", "last"}
+#
+# rows inside a partition are sorted by timestamp, so range reads are two searchsorted calls.
+
+ARCHIVE_DIR = os.environ.get("TOILET_ARCHIVE_DIR", "visit_archive")
+
+COLUMN_DTYPES = {
+    "visit_id": "S32",
+    "timestamp": "datetime64[us]",
+    "ph": "float64",
+    "protein": "float64",
+    "glucose": "float64",
+    "color_score": "float64",
+    "temp": "float64",
+    "stool_score": "int64",
+    "hydrated_score": "float64",
+    "nutrition_score": "float64",
+    "report_code": "int8",
+}
+# partitions written before report codes have no report_code.npy (only a leftover
+# report_text.json); their codes are derived from the stored readings on read
+
+
+def _user_dir(user_id):
+    return os.path.join(ARCHIVE_DIR, user_id)
+
+
+def _partition_dir(user_id, month):
+    return os.path.join(_user_dir(user_id), month)
+
+
+def list_partitions(user_id):
+    try:
+        return sorted(m for m in os.listdir(_user_dir(user_id)) if len(m) == 7 and m[4] == "-")
+    except FileNotFoundError:
+        return []
+
+
+def partition_meta(user_id, month):
+    with open(os.path.join(_partition_dir(user_id, month), "meta.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_partition(user_id, month, columns):
+    # numeric columns come back as read-only memory maps
+    path = _partition_dir(user_id, month)
+    out = {}
+    for col in columns:
+        if col == "report_code" and not os.path.exists(os.path.join(path, "report_code.npy")):
+            out[col] = report_codes(*(np.load(os.path.join(path, f"{k}.npy"), mmap_mode="r") for k in REPORT_KEYS))
+        else:
+            out[col] = np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r")
+    return out
+
+
+def write_partition(user_id, month, columns, merge=True):
+    # columns: dict of arrays for every COLUMN_DTYPES key; merged with any existing
+    # partition for the same month (or replacing it with merge=False), then swapped in as a
+    # whole directory
+    if merge and month in list_partitions(user_id):
+        old = read_partition(user_id, month, list(COLUMN_DTYPES))
+        columns = {k: np.concatenate([np.asarray(old[k]), np.asarray(columns[k], dtype=old[k].dtype)]) for k in old}
+        # a migration that wrote this partition but died before its DELETE committed (or a
+        # retried one) hands the same visits in again: keep one copy, the newest
+        ids = columns["visit_id"]
+        _, last = np.unique(ids[::-1], return_index=True)
+        if len(last) < len(ids):
+            keep = np.sort(len(ids) - 1 - last)
+            columns = {k: v[keep] for k, v in columns.items()}
+
+    ts = np.asarray(columns["timestamp"], dtype=COLUMN_DTYPES["timestamp"])
+    order = np.argsort(ts, kind="stable")
+    final = _partition_dir(user_id, month)
+    tmp = final + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for col, dtype in COLUMN_DTYPES.items():
+        np.save(os.path.join(tmp, f"{col}.npy"), np.asarray(columns[col], dtype=dtype)[order])
+    meta = {"n": int(len(ts)), "first": str(ts[order[0]]), "last": str(ts[order[-1]])}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    if os.path.isdir(final):
+        old_dir = final + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(final, old_dir)
+        os.replace(tmp, final)
+        shutil.rmtree(old_dir)
+    else:
+        os.replace(tmp, final)
+    return meta
+
+
+def _month_of(ts):
+    return str(np.datetime64(ts, "M"))
+
+
+def scan(user_id, columns, start=None, end=None, reverse=False):
+    # yields one dict of (memory-mapped) column slices per partition overlapping [start, end],
+    # oldest month first (newest first with reverse=True)
+    lo_month = _month_of(start) if start is not None else None
+    hi_month = _month_of(end) if end is not None else None
+    need = list(dict.fromkeys(["timestamp"] + list(columns)))
+    months = list_partitions(user_id)
+    for month in reversed(months) if reverse else months:
+        if (lo_month and month < lo_month) or (hi_month and month > hi_month):
+            continue
+        part = read_partition(user_id, month, need)
+        ts = part["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(ts, np.datetime64(start, "us"), side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, np.datetime64(end, "us"), side="right"))
+        if hi > lo:
+            yield {k: v[lo:hi] for k, v in part.items()}
+
+
+def read_columns(user_id, columns, start=None, end=None):
+    # concatenated columns for the range (copies only the selected slices)
+    parts = list(scan(user_id, columns, start, end))
+    need = list(dict.fromkeys(["timestamp"] + list(columns)))
+    if not parts:
+        return {k: np.array([], dtype=COLUMN_DTYPES.get(k, object)) for k in need}
+    return {k: np.concatenate([p[k] for p in parts]) for k in need}
+
+
+def count(user_id):
+    return sum(partition_meta(user_id, m)["n"] for m in list_partitions(user_id))
+
+
+def bounds(user_id):
+    months = list_partitions(user_id)
+    if not months:
+        return None
+    return partition_meta(user_id, months[0])["first"], partition_meta(user_id, months[-1])["last"]
+
+
+def list_users():
+    try:
+        return sorted(os.listdir(ARCHIVE_DIR))
+    except FileNotFoundError:
+        return []
+
+
+def iter_visits(user_id, columns):
+    # archived rows as dicts with TS_FORMAT timestamps, oldest first (for replays)
+    for part in scan(user_id, columns):
+        stamps = np.char.replace(np.datetime_as_string(part["timestamp"], unit="us"), "T", " ")
+        values = [part[k].tolist() for k in columns]
+        for i, ts in enumerate(stamps.tolist()):
+            row = {k: values[j][i] for j, k in enumerate(columns)}
+            row["timestamp"] = ts
+            row["user_id"] = user_id
+            yield row
@@ -0,0 +1,175 @@
+import heapq
+import json
+from datetime import date
+
+from . import archive
+
+# ---------------------------
+# Badge rule engine
+# ---------------------------
+# each user keeps a small running state (streaks, EWMAs, last-seen day) that is updated in
+# O(1) per visit inside the same transaction that inserts the visit. rules only look at that
+# state, so checking badges never rescans visit history.
+
+
+class Count:
+    def initial(self):
+        return 0
+
+    def update(self, state, visit):
+        return state + 1
+
+
+class Streak:
+    # consecutive visits satisfying `pred`
+    def __init__(self, pred):
+        self.pred = pred
+
+    def initial(self):
+        return 0
+
+    def update(self, state, visit):
+        return state + 1 if self.pred(visit) else 0
+
+
+class DayStreak:
+    # consecutive calendar days with at least one visit: [streak, last_day]
+    def initial(self):
+        return [0, None]
+
+    def update(self, state, visit):
+        streak, last_day = state
+        day = visit["timestamp"][:10]
+        if day == last_day:
+            return state
+        if last_day is not None and (date.fromisoformat(day) - date.fromisoformat(last_day)).days == 1:
+            return [streak + 1, day]
+        return [1, day]
+
+
+class Ewma:
+    # exponentially weighted mean of `value(visit)`
+    def __init__(self, value, alpha):
+        self.value = value
+        self.alpha = alpha
+
+    def initial(self):
+        return None
+
+    def update(self, state, visit):
+        x = self.value(visit)
+        return x if state is None else state + self.alpha * (x - state)
+
+
+def _overall(visit):
+    return (visit["stool_score"] + visit["hydrated_score"] + visit["nutrition_score"]) / 3
+
+
+ACCUMULATORS = {
+    "visits": Count(),
+    "hydrated_streak": Streak(lambda v: v["hydrated_score"] >= 70),
+    "day_streak": DayStreak(),
+    "nutrition_recent": Ewma(lambda v: v["nutrition_score"], 0.5),
+    "nutrition_baseline": Ewma(lambda v: v["nutrition_score"], 0.1),
+    "health_avg": Ewma(_overall, 0.1),
+}
+
+
+class Rule:
+    def __init__(self, name, description, check):
+        self.name = name
+        self.description = description
+        self.check = check
+
+
+RULES = [
+    Rule("Hydrated Streak", "연속 3회 수분 상태 양호", lambda s: s["hydrated_streak"] >= 3),
+    Rule(
+        "Nutrition Improved", "최근 영양 점수 향상",
+        lambda s: s["visits"] >= 5 and s["nutrition_recent"] > s["nutrition_baseline"] + 5,
+    ),
+    Rule("Clean Flusher", "규칙적으로 물 내림을 준수", lambda s: s["visits"] >= 10),
+    Rule("30일 연속 방문", "30일 연속 방문 기록", lambda s: s["day_streak"][0] >= 30),
+    Rule("건강 마스터", "건강지수 90점 이상 유지", lambda s: s["visits"] >= 10 and s["health_avg"] >= 90),
+]
+
+
+def initial_state():
+    state = {name: acc.initial() for name, acc in ACCUMULATORS.items()}
+    state["last_ts"] = None
+    return state
+
+
+def apply_visit(state, visit):
+    # visit: dict with timestamp (TS_FORMAT string) and the three scores
+    for name, acc in ACCUMULATORS.items():
+        state[name] = acc.update(state[name], visit)
+    state["last_ts"] = visit["timestamp"]
+    return state
+
+
+def earned_badges(state):
+    return [rule.name for rule in RULES if rule.check(state)]
+
+
+# ---------------------------
+# persistence (called with the writer connection, inside its transaction)
+# ---------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS badge_state (
+    user_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+)
+"""
+
+_SCORE_FIELDS = ["stool_score", "hydrated_score", "nutrition_score"]
+_STATE_FIELDS = "timestamp, " + ", ".join(_SCORE_FIELDS)
+
+
+def load_state(c, user_id):
+    row = c.execute("SELECT state FROM badge_state WHERE user_id=?", (user_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def save_state(c, user_id, state):
+    c.execute(
+        "INSERT INTO badge_state (user_id, state) VALUES (?,?) "
+        "ON CONFLICT(user_id) DO UPDATE SET state=excluded.state",
+        (user_id, json.dumps(state)),
+    )
+
+
+def rebuild_state(c, user_id):
+    # full replay of a user's history (archive + hot table); only needed for backfilled
+    # (out-of-order) visits or rule changes
+    state = initial_state()
+    cur = c.execute(f"SELECT {_STATE_FIELDS} FROM visits WHERE user_id=? ORDER BY timestamp", (user_id,))
+    hot = (
+        {"timestamp": ts, "stool_score": stool, "hydrated_score": hydrated, "nutrition_score": nutrition}
+        for ts, stool, hydrated, nutrition in cur
+    )
+    cold = archive.iter_visits(user_id, _SCORE_FIELDS)
+    for visit in heapq.merge(cold, hot, key=lambda v: v["timestamp"]):
+        apply_visit(state, visit)
+    save_state(c, user_id, state)
+    return state
+
+
+def update_states(c, visits):
+    # visits: dicts with user_id, timestamp and scores, already inserted in this transaction
+    by_user = {}
+    for v in visits:
+        by_user.setdefault(v["user_id"], []).append(v)
+    for user_id, new in by_user.items():
+        new.sort(key=lambda v: v["timestamp"])
+        state = load_state(c, user_id)
+        if state is None:
+            # first visits, or state predates this engine: replay what is stored
+            rebuild_state(c, user_id)
+            continue
+        if state["last_ts"] is not None and new[0]["timestamp"] < state["last_ts"]:
+            rebuild_state(c, user_id)
+            continue
+        for v in new:
+            apply_visit(state, v)
+        save_state(c, user_id, state)
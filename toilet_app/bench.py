@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+# ---------------------------
+# Benchmark suite
+# ---------------------------
+#   python -m toilet_app.bench --scales 100x30,1000x90 --out bench.json
+#
+# each scale (users x days) runs in a fresh subprocess with its own temp database, so the
+# DB pool, query cache and archive start cold. results are one JSON document:
+#   {"meta": {...}, "results": [{"scale", "metric", "value", "unit"}, ...]}
+
+DEFAULT_SCALES = "100x30,1000x90"
+TAB_SAMPLE_USERS = 20
+TAB_REPEAT = 5
+
+
+def _result(scale, metric, value, unit):
+    return {"scale": scale, "metric": metric, "value": round(float(value), 6), "unit": unit}
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def _tab_queries(user_id, bounds):
+    # the queries each tab of views/health.py issues for one user
+    from .db import (
+        count_visits, get_badges, get_latest_visit, get_visit_bounds, get_visit_page, get_visit_rollup, get_visits_for_user,
+    )
+    from .rollup import pick_resolution
+
+    start, end = bounds
+    metrics = ["stool_score", "hydrated_score", "nutrition_score"]
+
+    def graph():
+        get_visit_bounds(user_id)
+        resolution = pick_resolution(start, end)
+        if resolution == "raw":
+            get_visits_for_user(user_id, start=start, end=end, columns=metrics)
+            get_visit_page(user_id, metrics, start=start, end=end)
+        else:
+            get_visit_rollup(user_id, start, end, resolution)
+
+    return {
+        "dashboard": lambda: (count_visits(user_id), get_latest_visit(user_id)),
+        "visits": lambda: get_visit_page(user_id, metrics, limit=10, newest_first=True),
+        "report": lambda: get_latest_visit(user_id),
+        "graph": graph,
+        "badges": lambda: get_badges(user_id),
+    }
+
+
+def run_scale(n_users, n_days, seed):
+    from .cache import query_cache
+    from .db import create_user, get_visit_bounds, get_visits_for_user, log_visits
+    from .downsample import downsample_long, point_budget
+    from .scoring import score_batch, score_visit_batch
+    from .synth import generate_sensor_batch, generate_users, generate_visits, iter_readings
+
+    scale = f"{n_users}x{n_days}"
+    results = []
+
+    visits = generate_visits(n_users, n_days, seed=seed)
+    n = len(visits["user"])
+    results.append(_result(scale, "visits", n, "rows"))
+
+    # scoring throughput
+    batch = generate_sensor_batch(n, seed=seed)
+    secs = _timed(lambda: score_batch(batch))
+    results.append(_result(scale, "score_batch_throughput", n / secs, "rows/s"))
+    secs = _timed(lambda: score_visit_batch(*(visits[k] for k in ("ph", "protein", "glucose", "color_score", "temp"))))
+    results.append(_result(scale, "score_visit_batch_throughput", n / secs, "rows/s"))
+
+    # ingest rate (scoring + report + bulk insert + rollups + badges)
+    users = generate_users(n_users, seed=seed)
+    user_ids = [
+        create_user(str(users["nickname"][i]), int(users["age"][i]), str(users["gender"][i]), ["특이사항 없음"])
+        for i in range(n_users)
+    ]
+    secs = _timed(lambda: log_visits(iter_readings(visits, user_ids)))
+    results.append(_result(scale, "ingest_rate", n / secs, "rows/s"))
+
+    # per-tab query latency, cold (cache cleared) and warm
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(user_ids, min(TAB_SAMPLE_USERS, n_users), replace=False)
+    timings = {}
+    for user_id in sample:
+        bounds = get_visit_bounds(user_id)
+        if bounds is None:
+            continue
+        for tab, fn in _tab_queries(user_id, bounds).items():
+            for _ in range(TAB_REPEAT):
+                query_cache.clear()
+                timings.setdefault((tab, "cold"), []).append(_timed(fn))
+                timings.setdefault((tab, "warm"), []).append(_timed(fn))
+    for (tab, mode), values in sorted(timings.items()):
+        ms = np.array(values) * 1000
+        results.append(_result(scale, f"tab_{tab}_{mode}_p50", np.percentile(ms, 50), "ms"))
+        results.append(_result(scale, f"tab_{tab}_{mode}_p95", np.percentile(ms, 95), "ms"))
+
+    # chart payload for one user's full history
+    user_id = sample[0]
+    df = get_visits_for_user(user_id)
+    metrics = ["stool_score", "hydrated_score", "nutrition_score"]
+    raw = df[["timestamp"] + metrics].melt("timestamp", var_name="metric", value_name="value")
+    down = downsample_long(df, "timestamp", metrics, point_budget())
+    results.append(_result(scale, "chart_payload_raw", len(raw.to_json(orient="records")), "bytes"))
+    results.append(_result(scale, "chart_payload_downsampled", len(down.to_json(orient="records")), "bytes"))
+    return results
+
+
+def _run_child(scale, seed):
+    n_users, n_days = (int(x) for x in scale.split("x"))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["TOILET_DB_PATH"] = os.path.join(tmp, "bench.db")
+        env["TOILET_ARCHIVE_DIR"] = os.path.join(tmp, "archive")
+        out = subprocess.run(
+            [sys.executable, "-m", "toilet_app.bench", "--child", str(n_users), str(n_days), "--seed", str(seed)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart toilet benchmark suite")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="comma separated USERSxDAYS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--child", nargs=2, type=int, metavar=("USERS", "DAYS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scale(args.child[0], args.child[1], args.seed)))
+        return
+
+    results = []
+    for scale in args.scales.split(","):
+        print(f"running {scale} ...", file=sys.stderr)
+        results += _run_child(scale.strip(), args.seed)
+    doc = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    text = json.dumps(doc, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import OrderedDict, defaultdict
+
+from . import perf
+
+# ---------------------------
+# Query cache (process-wide, so every Streamlit session shares it)
+# ---------------------------
+# entries are grouped under a tag such as ("visits", user_id); writers invalidate
+# the tag they touched. cached values are shared between sessions: treat them as read-only.
+# with perf enabled, hits/misses are also counted per query ("cache.<query>.hit|miss").
+
+
+def _query_name(tag, key):
+    # ("visits", uid) + "count" -> "visits.count"; ("visits", uid) + ("page", ...) -> "visits.page"
+    if isinstance(key, tuple) and key:
+        key = key[0]
+    return f"{tag[0]}.{key}" if isinstance(key, str) else tag[0]
+
+
+class QueryCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._tags = defaultdict(set)
+        # bumped on invalidate (per tag) or clear (all tags) so a load that raced with a
+        # write is not stored
+        self._generation = defaultdict(int)
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, tag, key, loader):
+        full_key = (tag, key)
+        with self._lock:
+            if full_key in self._data:
+                self._data.move_to_end(full_key)
+                self.hits += 1
+                value = self._data[full_key]
+                hit = True
+            else:
+                self.misses += 1
+                generation = (self._epoch, self._generation[tag])
+                hit = False
+        if perf.enabled():
+            perf.count(f"cache.{_query_name(tag, key)}.{'hit' if hit else 'miss'}")
+        if hit:
+            return value
+        value = loader()
+        with self._lock:
+            if (self._epoch, self._generation[tag]) != generation:
+                return value
+            self._data[full_key] = value
+            self._data.move_to_end(full_key)
+            self._tags[tag].add(full_key)
+            while len(self._data) > self.maxsize:
+                old_key, _ = self._data.popitem(last=False)
+                self._discard_tag(old_key)
+        return value
+
+    def _discard_tag(self, full_key):
+        keys = self._tags.get(full_key[0])
+        if keys is not None:
+            keys.discard(full_key)
+            if not keys:
+                del self._tags[full_key[0]]
+
+    def invalidate(self, tag):
+        with self._lock:
+            self._generation[tag] += 1
+            for full_key in self._tags.pop(tag, ()):
+                self._data.pop(full_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+query_cache = QueryCache(int(os.environ.get("TOILET_CACHE_SIZE", "512")))
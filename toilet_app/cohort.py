@@ -0,0 +1,205 @@
+import json
+from datetime import date, timedelta
+
+import numpy as np
+
+from . import archive
+
+# ---------------------------
+# Cohort percentile sketches
+# ---------------------------
+# one fixed-bin histogram (scores 0..100, one bin per point) per metric per cohort
+# (age band x gender) per day, updated inside the visit insert transaction. histograms
+# merge by adding counts, so a percentile over the last WINDOW_DAYS reads at most that many
+# rows and never touches other users' visits. a full rebuild counts hot visits in SQL and
+# streams the archive one user-month at a time, so no visit list is ever materialized.
+
+METRICS = ["stool_score", "hydrated_score", "nutrition_score"]
+BINS = 101
+AGE_BAND = 10
+MAX_BAND = 80
+WINDOW_DAYS = 30
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS cohort_sketch (
+        cohort TEXT NOT NULL,
+        day TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        sketch TEXT NOT NULL,
+        PRIMARY KEY (cohort, day)
+    )""",
+]
+
+
+def cohort_of(age, gender):
+    # visits count towards the cohort the user was in when they were logged
+    band = "?" if age is None else min(int(age) // AGE_BAND * AGE_BAND, MAX_BAND)
+    return f"{band}|{gender or '선택안함'}"
+
+
+def cohort_label(cohort):
+    band, gender = cohort.split("|", 1)
+    if band == "?":
+        return gender
+    return f"{band}대{' 이상' if int(band) >= MAX_BAND else ''} {gender}"
+
+
+def _bin(x):
+    # rounds half up (int() truncates like SQL's CAST), so _bin_sql puts a visit in the same bin
+    return min(max(int(x + 0.5), 0), BINS - 1)
+
+
+def _bin_sql(col):
+    return f"MIN(MAX(CAST({col} + 0.5 AS INTEGER), 0), {BINS - 1})"
+
+
+# cohort_of in SQL, over the users table aliased u
+COHORT_SQL = (
+    f"(CASE WHEN u.age IS NULL THEN '?' ELSE MIN(CAST(u.age AS INTEGER) / {AGE_BAND} * {AGE_BAND}, {MAX_BAND}) END)"
+    " || '|' || COALESCE(NULLIF(u.gender, ''), '선택안함')"
+)
+
+
+def empty_sketch():
+    return {m: [0] * BINS for m in METRICS}
+
+
+def merge(into, other):
+    for m in METRICS:
+        a, b = into[m], other[m]
+        for i in range(BINS):
+            a[i] += b[i]
+    return into
+
+
+def _aggregate(visits, cohorts):
+    # visits: dicts with user_id, timestamp and METRICS; cohorts: user_id -> cohort
+    acc = {}
+    for v in visits:
+        key = (cohorts[v["user_id"]], v["timestamp"][:10])
+        entry = acc.get(key)
+        if entry is None:
+            entry = acc[key] = [0, empty_sketch()]
+        entry[0] += 1
+        for m in METRICS:
+            entry[1][m][_bin(v[m])] += 1
+    return acc
+
+
+def user_cohorts(c, user_ids=None):
+    if user_ids is None:
+        rows = c.execute("SELECT user_id, age, gender FROM users").fetchall()
+    else:
+        user_ids = list(user_ids)
+        rows = c.execute(
+            f"SELECT user_id, age, gender FROM users WHERE user_id IN ({', '.join('?' * len(user_ids))})", user_ids
+        ).fetchall()
+    return {user_id: cohort_of(age, gender) for user_id, age, gender in rows}
+
+
+def update(c, visits):
+    # visits inserted in this transaction; returns the cohorts whose sketches changed
+    cohorts = user_cohorts(c, {v["user_id"] for v in visits})
+    visits = [v for v in visits if v["user_id"] in cohorts]
+    for (cohort, day), (n, sketch) in _aggregate(visits, cohorts).items():
+        row = c.execute("SELECT n, sketch FROM cohort_sketch WHERE cohort=? AND day=?", (cohort, day)).fetchone()
+        if row is not None:
+            n += row[0]
+            merge(sketch, json.loads(row[1]))
+        c.execute(
+            "INSERT OR REPLACE INTO cohort_sketch (cohort, day, n, sketch) VALUES (?,?,?,?)",
+            (cohort, day, n, json.dumps(sketch)),
+        )
+    return set(cohorts.values())
+
+
+# ---------------------------
+# full rebuild: counts are kept as {(cohort, day): int64 array [metric, bin]} and summed
+# ---------------------------
+def add_counts(acc, cohort, timestamps, values):
+    # one user's visits: datetime64 timestamps and {metric: scores} arrays
+    if not len(timestamps):
+        return acc
+    days, inv = np.unique(np.asarray(timestamps).astype("datetime64[D]"), return_inverse=True)
+    counts = np.zeros((len(days), len(METRICS), BINS), dtype=np.int64)
+    for i, m in enumerate(METRICS):
+        bins = np.clip((np.asarray(values[m], dtype=np.float64) + 0.5).astype(np.int64), 0, BINS - 1)
+        counts[:, i, :] = np.bincount(inv * BINS + bins, minlength=len(days) * BINS).reshape(len(days), BINS)
+    for day, day_counts in zip(np.datetime_as_string(days), counts):
+        entry = acc.get((cohort, day))
+        if entry is None:
+            acc[(cohort, day)] = day_counts
+        else:
+            entry += day_counts
+    return acc
+
+
+def merge_counts(into, other):
+    for key, counts in other.items():
+        entry = into.get(key)
+        if entry is None:
+            into[key] = counts
+        else:
+            entry += counts
+    return into
+
+
+def _hot_counts(c, acc):
+    for i, m in enumerate(METRICS):
+        rows = c.execute(
+            f"SELECT {COHORT_SQL} AS cohort, substr(v.timestamp, 1, 10) AS day, {_bin_sql('v.' + m)} AS bin, COUNT(*) "
+            "FROM visits v JOIN users u ON u.user_id = v.user_id GROUP BY cohort, day, bin"
+        )
+        for cohort, day, b, n in rows:
+            entry = acc.get((cohort, day))
+            if entry is None:
+                entry = acc[(cohort, day)] = np.zeros((len(METRICS), BINS), dtype=np.int64)
+            entry[i, b] += n
+    return acc
+
+
+def archive_counts(acc, user_id, cohort):
+    for part in archive.scan(user_id, METRICS):
+        add_counts(acc, cohort, part["timestamp"], part)
+    return acc
+
+
+def write_counts(c, acc):
+    c.execute("DELETE FROM cohort_sketch")
+    c.executemany(
+        "INSERT INTO cohort_sketch (cohort, day, n, sketch) VALUES (?,?,?,?)",
+        [
+            (cohort, day, int(counts[0].sum()), json.dumps({m: counts[i].tolist() for i, m in enumerate(METRICS)}))
+            for (cohort, day), counts in acc.items()
+        ],
+    )
+
+
+def rebuild(c):
+    # full recompute from hot visits plus the archive, using users' current age/gender
+    cohorts = user_cohorts(c)
+    acc = _hot_counts(c, {})
+    for user_id in archive.list_users():
+        if user_id in cohorts:
+            archive_counts(acc, user_id, cohorts[user_id])
+    write_counts(c, acc)
+
+
+def window_sketch(c, cohort, end_day, days=WINDOW_DAYS):
+    start_day = (date.fromisoformat(end_day) - timedelta(days=days - 1)).isoformat()
+    total, sketch = 0, empty_sketch()
+    for n, text in c.execute(
+        "SELECT n, sketch FROM cohort_sketch WHERE cohort=? AND day >= ? AND day <= ?", (cohort, start_day, end_day)
+    ):
+        total += n
+        merge(sketch, json.loads(text))
+    return total, sketch
+
+
+def percentile(hist, x):
+    # share of the cohort scoring below x (ties count half), 0..100
+    n = sum(hist)
+    if not n:
+        return None
+    b = _bin(x)
+    return (sum(hist[:b]) + 0.5 * hist[b]) / n * 100
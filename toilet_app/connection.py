@@ -0,0 +1,145 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# ---------------------------
+# SQLite connection manager
+# ---------------------------
+# - WAL journaling: readers never wait for the writer
+# - reads check a connection out of a bounded pool and return it when done (`with
+#   pool.reader() as c:`); Streamlit starts a new script thread on every rerun, so
+#   per-thread connections would be reopened each time. nested blocks on one thread share
+#   the connection they already hold
+# - a single writer thread drains a queue of write jobs; jobs that arrive together are
+#   committed in one transaction (group commit), each inside its own savepoint
+# - "database is locked" / busy errors are retried with exponential backoff
+
+BUSY_RETRIES = 6
+BUSY_BACKOFF = 0.05
+MAX_GROUP = 64
+MAX_READERS = 8
+
+
+def _is_busy(exc):
+    msg = str(exc).lower()
+    return "locked" in msg or "busy" in msg
+
+
+class ConnectionManager:
+    def __init__(self, path, timeout=5.0, max_readers=MAX_READERS):
+        self.path = path
+        self.timeout = timeout
+        self.max_readers = max_readers
+        self._local = threading.local()
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        c = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        return c
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            grow = self._opened < self.max_readers
+            if grow:
+                self._opened += 1
+        if grow:
+            try:
+                return self._connect()
+            except Exception:
+                with self._open_lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("database is busy: no free reader connection") from None
+
+    @contextmanager
+    def reader(self):
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            yield held
+            return
+        c = self._checkout()
+        self._local.held = c
+        try:
+            yield c
+        finally:
+            self._local.held = None
+            self._idle.put(c)
+
+    def submit(self, fn):
+        # fn(conn) runs on the writer thread inside a transaction; returns a Future
+        fut = Future()
+        self._jobs.put((fn, fut))
+        return fut
+
+    def write(self, fn):
+        return self.submit(fn).result()
+
+    def _write_loop(self):
+        c = self._connect()
+        while True:
+            jobs = [self._jobs.get()]
+            while len(jobs) < MAX_GROUP:
+                try:
+                    jobs.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_group(c, jobs)
+
+    def _run_group(self, c, jobs):
+        for attempt in range(BUSY_RETRIES):
+            outcomes = []
+            try:
+                c.execute("BEGIN IMMEDIATE")
+                for fn, fut in jobs:
+                    c.execute("SAVEPOINT job")
+                    try:
+                        result = fn(c)
+                    except sqlite3.OperationalError as exc:
+                        if _is_busy(exc):
+                            raise
+                        c.execute("ROLLBACK TO job")
+                        outcomes.append((fut, None, exc))
+                    except Exception as exc:
+                        c.execute("ROLLBACK TO job")
+                        outcomes.append((fut, None, exc))
+                    else:
+                        outcomes.append((fut, result, None))
+                    c.execute("RELEASE job")
+                c.execute("COMMIT")
+                break
+            except sqlite3.OperationalError as exc:
+                if c.in_transaction:
+                    c.execute("ROLLBACK")
+                if not _is_busy(exc) or attempt == BUSY_RETRIES - 1:
+                    outcomes = [(fut, None, exc) for _, fut in jobs]
+                    break
+                time.sleep(BUSY_BACKOFF * (2 ** attempt))
+            except Exception as exc:
+                if c.in_transaction:
+                    c.execute("ROLLBACK")
+                outcomes = [(fut, None, exc) for _, fut in jobs]
+                break
+
+        for fut, result, exc in outcomes:
+            if exc is None:
+                fut.set_result(result)
+            else:
+                fut.set_exception(exc)
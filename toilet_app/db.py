@@ -0,0 +1,706 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from . import anomaly, archive, badges, cohort, perf, rollup, stalls
+from .cache import query_cache
+from .connection import ConnectionManager
+from .directory import UserDirectory
+from .scoring import READING_KEYS, REPORT_KEYS, report_codes, score_visit_batch
+
+# ---------------------------
+# SQLite storage (users / visits / badges)
+# ---------------------------
+DB_PATH = os.environ.get("TOILET_DB_PATH", "toilet_health.db")
+
+LOG_BATCH_SIZE = 1000
+VISIT_PAGE_SIZE = 25
+ARCHIVE_AFTER_DAYS = int(os.environ.get("TOILET_ARCHIVE_AFTER_DAYS", "180"))
+
+# fixed-width timestamps so string order == time order inside the (user_id, timestamp) index
+TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+VISIT_COLUMNS = [
+    "visit_id", "user_id", "timestamp",
+    "ph", "protein", "glucose", "color_score", "temp",
+    "stool_score", "hydrated_score", "nutrition_score", "report_code",
+]
+
+# in-memory (and cached) visit frames are kept compact: float32 scores, int8 stool score
+# (0..100) and report code, and a categorical user_id. readings stay float64: they are
+# compared against clinical thresholds (0.6 protein, 0.4 glucose, ...) exactly like
+# report_code was computed, and float32(0.6) > 0.6
+VISIT_DTYPES = {
+    "user_id": "category",
+    "stool_score": "int8",
+    "hydrated_score": "float32",
+    "nutrition_score": "float32",
+    "report_code": "int8",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    nickname TEXT NOT NULL,
+    age INTEGER,
+    gender TEXT,
+    health_flags TEXT,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS visits (
+    visit_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    ph REAL,
+    protein REAL,
+    glucose REAL,
+    color_score REAL,
+    temp REAL,
+    stool_score INTEGER,
+    hydrated_score REAL,
+    nutrition_score REAL,
+    report_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_visits_user_ts ON visits(user_id, timestamp);
+CREATE TABLE IF NOT EXISTS badges (
+    user_id TEXT NOT NULL,
+    badge_name TEXT NOT NULL,
+    awarded_at TEXT,
+    PRIMARY KEY (user_id, badge_name)
+);
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+# scoring.report_codes in SQL, for rows stored before report codes existed
+REPORT_CODE_SQL = (
+    "(CASE WHEN ph >= 6.5 AND ph <= 7.5 THEN 0 ELSE 1 END) + (hydrated_score < 70) * 2"
+    " + (protein > 0.6) * 4 + (glucose > 0.4) * 8 + (color_score > 0.8) * 16"
+)
+
+
+def _migrate_report_text(c):
+    # per-visit report_text -> report_code; the text is rendered from the code on display
+    cols = {row[1] for row in c.execute("PRAGMA table_info(visits)")}
+    if "report_code" in cols:
+        return
+    c.execute("ALTER TABLE visits ADD COLUMN report_code INTEGER")
+    c.execute(f"UPDATE visits SET report_code = {REPORT_CODE_SQL}")
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        c.execute("ALTER TABLE visits DROP COLUMN report_text")
+    else:
+        c.execute("UPDATE visits SET report_text = NULL")
+
+
+def init_db(c):
+    for stmt in SCHEMA.split(";"):
+        if stmt.strip():
+            c.execute(stmt)
+    _migrate_report_text(c)
+    c.execute(badges.SCHEMA)
+    for stmt in anomaly.SCHEMA:
+        c.execute(stmt)
+    for stmt in rollup.SCHEMA:
+        c.execute(stmt)
+    # rollup tables added to an existing database: backfill them once
+    if c.execute("SELECT 1 FROM visit_rollup_day LIMIT 1").fetchone() is None:
+        rollup.rebuild_rollups(c)
+    for stmt in cohort.SCHEMA:
+        c.execute(stmt)
+    for stmt in stalls.SCHEMA:
+        c.execute(stmt)
+    if c.execute("SELECT 1 FROM cohort_sketch LIMIT 1").fetchone() is None:
+        cohort.rebuild(c)
+
+
+# reads check out a connection with `with pool.reader() as c:`; writes go through pool.write()
+pool = ConnectionManager(DB_PATH)
+pool.write(init_db)
+
+
+def format_ts(ts):
+    return ts.strftime(TS_FORMAT)
+
+
+def parse_ts(ts):
+    # TS_FORMAT or ISO 8601 (devices send either); aware times are converted to naive UTC.
+    # raises ValueError for anything else
+    if isinstance(ts, datetime):
+        dt = ts
+    elif isinstance(ts, str):
+        try:
+            return datetime.strptime(ts, TS_FORMAT)
+        except ValueError:
+            dt = datetime.fromisoformat(ts.strip().replace("Z", "+00:00"))
+    else:
+        raise ValueError(f"not a timestamp: {ts!r}")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+# ---------------------------
+# change log: lets other processes (e.g. toilet_app.ingest) invalidate this process's cache
+# ---------------------------
+CHANGE_LOG_KEEP = 100000
+_change_lock = threading.Lock()
+_last_change_seq = None
+
+
+def _record_change(c, kind, user_id=""):
+    c.execute("INSERT INTO change_log (kind, user_id) VALUES (?,?)", (kind, user_id))
+
+
+def _change_tag(kind, user_id):
+    return (kind,) if kind == "users" else (kind, user_id)
+
+
+def sync_external_writes():
+    # call once per rerun; drops cache entries for anything written since the last call
+    global _last_change_seq
+    with _change_lock, pool.reader() as c:
+        if _last_change_seq is None:
+            _last_change_seq = c.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+            return
+        oldest, newest = c.execute("SELECT MIN(seq), MAX(seq) FROM change_log").fetchone()
+        if oldest is not None and oldest > _last_change_seq + 1:
+            # fell behind prune_change_log: the changes we missed are gone, so drop everything
+            query_cache.clear()
+            _last_change_seq = newest
+            return
+        rows = c.execute(
+            "SELECT seq, kind, user_id FROM change_log WHERE seq > ? ORDER BY seq", (_last_change_seq,)
+        ).fetchall()
+        for seq, kind, user_id in rows:
+            query_cache.invalidate(_change_tag(kind, user_id))
+            _last_change_seq = seq
+
+
+def prune_change_log():
+    pool.write(lambda c: c.execute(
+        "DELETE FROM change_log WHERE seq < (SELECT MAX(seq) FROM change_log) - ?", (CHANGE_LOG_KEEP,)
+    ))
+
+
+def compact_visits(df):
+    # any visit frame with parsed timestamps -> VISIT_DTYPES (also re-compacts after concat)
+    return df.astype({k: v for k, v in VISIT_DTYPES.items() if k in df.columns})
+
+
+def _typed_visits(df):
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=TS_FORMAT)
+    return compact_visits(df)
+
+
+# ---------------------------
+# users
+# ---------------------------
+@perf.timed("db.get_users")
+def get_users():
+    return query_cache.get_or_load(("users",), (), _load_users)
+
+
+def _load_users():
+    with pool.reader() as c:
+        return pd.read_sql_query("SELECT user_id, nickname, age, gender FROM users ORDER BY created_at", c)
+
+
+@perf.timed("db.get_user_directory")
+def get_user_directory():
+    # indexed view of all users (see directory.py); rebuilt only after users change
+    return query_cache.get_or_load(("users",), "directory", lambda: UserDirectory(_load_users().to_dict("records")))
+
+
+@perf.timed("db.get_user")
+def get_user(user_id):
+    return query_cache.get_or_load(("user", user_id), (), lambda: _load_user(user_id))
+
+
+def _load_user(user_id):
+    with pool.reader() as c:
+        row = c.execute(
+            "SELECT user_id, nickname, age, gender, health_flags, created_at FROM users WHERE user_id=?", (user_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(["user_id", "nickname", "age", "gender", "health_flags", "created_at"], row))
+
+
+@perf.timed("db.create_user")
+def create_user(nickname, age, gender, health_flags):
+    user_id = uuid.uuid4().hex
+
+    def insert(c):
+        c.execute(
+            "INSERT INTO users (user_id, nickname, age, gender, health_flags, created_at) VALUES (?,?,?,?,?,?)",
+            (user_id, nickname, int(age), gender, ",".join(health_flags), format_ts(datetime.utcnow())),
+        )
+        _record_change(c, "users")
+
+    pool.write(insert)
+    query_cache.invalidate(("users",))
+    return user_id
+
+
+@perf.timed("db.update_user")
+def update_user(user_id, nickname, age, gender, health_flags):
+    def update(c):
+        c.execute(
+            "UPDATE users SET nickname=?, age=?, gender=?, health_flags=? WHERE user_id=?",
+            (nickname, int(age), gender, ",".join(health_flags), user_id),
+        )
+        _record_change(c, "users")
+        _record_change(c, "user", user_id)
+
+    pool.write(update)
+    query_cache.invalidate(("users",))
+    query_cache.invalidate(("user", user_id))
+
+
+# ---------------------------
+# visits
+# ---------------------------
+@perf.timed("db.get_visits_for_user")
+def get_visits_for_user(user_id, start=None, end=None, limit=None, latest=False, columns=None):
+    # rows come back sorted by timestamp (oldest first) with parsed, typed columns;
+    # latest=True returns the newest `limit` rows, newest first
+    key = (start, end, limit, latest, tuple(columns) if columns else None)
+    return query_cache.get_or_load(
+        ("visits", user_id), key, lambda: _load_visits(user_id, start, end, limit, latest, columns)
+    )
+
+
+def _load_visits(user_id, start, end, limit, latest, columns):
+    cols = columns or VISIT_COLUMNS
+    if "timestamp" not in cols:
+        cols = ["timestamp"] + list(cols)
+    q = f"SELECT {', '.join(cols)} FROM visits WHERE user_id=?"
+    params = [user_id]
+    if start is not None:
+        q += " AND timestamp >= ?"
+        params.append(format_ts(start))
+    if end is not None:
+        q += " AND timestamp <= ?"
+        params.append(format_ts(end))
+    q += " ORDER BY timestamp DESC" if latest else " ORDER BY timestamp"
+    if limit is not None:
+        q += " LIMIT ?"
+        params.append(int(limit))
+    with pool.reader() as c:
+        hot = _typed_visits(pd.read_sql_query(q, c, params=params))
+
+    # older months live in the columnar archive
+    cold_bounds = archive.bounds(user_id)
+    if cold_bounds is None:
+        return hot
+    if latest and limit is not None and len(hot) >= limit and pd.Timestamp(cold_bounds[1]) <= hot["timestamp"].iloc[-1]:
+        return hot
+    if latest and limit is not None:
+        # newest months first, stopping once `limit` archived rows are collected
+        need = list(dict.fromkeys(list(cols) + ["visit_id"]))
+        cold = _archived_page(user_id, need, None, int(limit), start, end, newest_first=True)[list(cols)]
+    else:
+        cold = _archived_visits(user_id, cols, start, end)
+    if cold.empty:
+        return hot
+    df = pd.concat([cold, hot], ignore_index=True).sort_values("timestamp", ascending=not latest, kind="stable")
+    if limit is not None:
+        df = df.head(int(limit))
+    return compact_visits(df.reset_index(drop=True))
+
+
+def _archived_visits(user_id, cols, start, end):
+    stored = [c for c in cols if c != "user_id"]
+    data = archive.read_columns(user_id, stored, start, end)
+    if "visit_id" in data:
+        data["visit_id"] = np.char.decode(data["visit_id"], "ascii")
+    df = pd.DataFrame(data)
+    if "user_id" in cols:
+        df["user_id"] = user_id
+    return compact_visits(df[cols])
+
+
+@perf.timed("db.get_visit_page")
+def get_visit_page(user_id, columns, after=None, limit=VISIT_PAGE_SIZE, start=None, end=None, newest_first=False):
+    # keyset page: up to `limit` rows strictly past the `after` cursor, in (timestamp, visit_id)
+    # order. only visit_id, timestamp and `columns` are read. returns (df, cursor for the next
+    # page or None on the last page)
+    cols = list(dict.fromkeys(["visit_id", "timestamp"] + list(columns)))
+    key = ("page", tuple(cols), after, limit, start, end, newest_first)
+    return query_cache.get_or_load(
+        ("visits", user_id), key, lambda: _load_visit_page(user_id, cols, after, limit, start, end, newest_first)
+    )
+
+
+def _load_visit_page(user_id, cols, after, limit, start, end, newest_first):
+    op, order = ("<", "DESC") if newest_first else (">", "ASC")
+    q = f"SELECT {', '.join(cols)} FROM visits WHERE user_id=?"
+    params = [user_id]
+    if start is not None:
+        q += " AND timestamp >= ?"
+        params.append(format_ts(start))
+    if end is not None:
+        q += " AND timestamp <= ?"
+        params.append(format_ts(end))
+    if after is not None:
+        # written so the timestamp bound can still use the (user_id, timestamp) index
+        q += f" AND timestamp {op}= ? AND (timestamp {op} ? OR visit_id {op} ?)"
+        params += [after[0], after[0], after[1]]
+    q += f" ORDER BY timestamp {order}, visit_id {order} LIMIT ?"
+    params.append(int(limit) + 1)
+    with pool.reader() as c:
+        df = _typed_visits(pd.read_sql_query(q, c, params=params))
+
+    if archive.bounds(user_id) is not None:
+        cold = _archived_page(user_id, cols, after, limit + 1, start, end, newest_first)
+        if not cold.empty:
+            df = compact_visits(pd.concat([cold, df], ignore_index=True).sort_values(
+                ["timestamp", "visit_id"], ascending=not newest_first, kind="stable"
+            ).head(limit + 1).reset_index(drop=True))
+
+    if len(df) <= limit:
+        return df, None
+    df = df.head(limit)
+    last = df.iloc[-1]
+    return df, (format_ts(last["timestamp"]), last["visit_id"])
+
+
+def _archived_page(user_id, cols, after, limit, start, end, newest_first):
+    if after is not None:
+        cursor = datetime.strptime(after[0], TS_FORMAT)
+        if newest_first:
+            end = cursor if end is None else min(end, cursor)
+        else:
+            start = cursor if start is None else max(start, cursor)
+    frames, n = [], 0
+    for part in archive.scan(user_id, [c for c in cols if c != "user_id"], start, end, reverse=newest_first):
+        frame = pd.DataFrame({k: np.asarray(v) for k, v in part.items()})
+        frame["visit_id"] = np.char.decode(frame["visit_id"].to_numpy(dtype="S32"), "ascii")
+        if after is not None:
+            ts = np.datetime64(cursor, "us")
+            past = (frame["timestamp"] < ts) | ((frame["timestamp"] == ts) & (frame["visit_id"] < after[1])) \
+                if newest_first else (frame["timestamp"] > ts) | ((frame["timestamp"] == ts) & (frame["visit_id"] > after[1]))
+            frame = frame[past]
+        frame = frame.sort_values(["timestamp", "visit_id"], ascending=not newest_first).head(limit - n)
+        frames.append(frame)
+        n += len(frame)
+        if n >= limit:
+            break
+    if not frames:
+        return pd.DataFrame(columns=cols)
+    df = pd.concat(frames, ignore_index=True)
+    if "user_id" in cols:
+        df["user_id"] = user_id
+    return compact_visits(df[cols])
+
+
+@perf.timed("db.get_latest_visit")
+def get_latest_visit(user_id):
+    df = get_visits_for_user(user_id, limit=1, latest=True)
+    return None if df.empty else df.iloc[0]
+
+
+@perf.timed("db.count_visits")
+def count_visits(user_id):
+    return query_cache.get_or_load(("visits", user_id), "count", lambda: _count_visits(user_id))
+
+
+def _count_visits(user_id):
+    with pool.reader() as c:
+        n = c.execute("SELECT COUNT(*) FROM visits WHERE user_id=?", (user_id,)).fetchone()[0]
+    return n + archive.count(user_id)
+
+
+@perf.timed("db.get_visit_bounds")
+def get_visit_bounds(user_id):
+    # (first, last) visit time, answered from the index without touching visit rows
+    return query_cache.get_or_load(("visits", user_id), "bounds", lambda: _visit_bounds(user_id))
+
+
+def _visit_bounds(user_id):
+    with pool.reader() as c:
+        first, last = c.execute("SELECT MIN(timestamp), MAX(timestamp) FROM visits WHERE user_id=?", (user_id,)).fetchone()
+    found = [] if first is None else [datetime.strptime(first, TS_FORMAT), datetime.strptime(last, TS_FORMAT)]
+    cold = archive.bounds(user_id)
+    if cold is not None:
+        found += [datetime.fromisoformat(cold[0]), datetime.fromisoformat(cold[1])]
+    if not found:
+        return None
+    return min(found), max(found)
+
+
+# ---------------------------
+# facility stall stats: snapshots of the ingest service's StallTracker (see stalls.py)
+# ---------------------------
+@perf.timed("db.save_facility_stats")
+def save_facility_stats(snapshot):
+    now = format_ts(datetime.utcnow())
+    rows = [(scope, json.dumps(stats), now) for scope, stats in snapshot.items()]
+    pool.write(lambda c: c.executemany(
+        "INSERT OR REPLACE INTO facility_stats (scope, stats, updated_at) VALUES (?,?,?)", rows
+    ))
+
+
+@perf.timed("db.get_facility_stats")
+def get_facility_stats(scope="facility"):
+    # (stats, updated_at) for "facility", "floor:<f>" or "stall:<id>"; None if never seen.
+    # not cached: these are live numbers, and each call is one primary-key lookup
+    with pool.reader() as c:
+        row = c.execute("SELECT stats, updated_at FROM facility_stats WHERE scope=?", (scope,)).fetchone()
+    if row is None:
+        return None
+    return json.loads(row[0]), datetime.strptime(row[1], TS_FORMAT)
+
+
+@perf.timed("db.get_floor_stats")
+def get_floor_stats():
+    # {floor: stats} for every floor, read as one primary-key range
+    with pool.reader() as c:
+        rows = c.execute(
+            "SELECT scope, stats FROM facility_stats WHERE scope >= 'floor:' AND scope < 'floor;' ORDER BY scope"
+        ).fetchall()
+    return {scope[len("floor:"):]: json.loads(stats) for scope, stats in rows}
+
+
+# ---------------------------
+# archive migration: whole (user, month) partitions older than ARCHIVE_AFTER_DAYS
+# ---------------------------
+def archive_cold_visits(older_than_days=ARCHIVE_AFTER_DAYS):
+    cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).strftime("%Y-%m")
+    with pool.reader() as c:
+        partitions = c.execute(
+            "SELECT DISTINCT user_id, substr(timestamp, 1, 7) FROM visits WHERE timestamp < ?", (cutoff,)
+        ).fetchall()
+    moved = 0
+    for user_id, month in partitions:
+        moved += pool.write(lambda c, user_id=user_id, month=month: _archive_partition(c, user_id, month))
+        query_cache.invalidate(("visits", user_id))
+    return moved
+
+
+def _archive_partition(c, user_id, month):
+    # runs on the writer thread, so no visit for this month can slip in between copy and delete
+    lo, hi = month + "-01", _next_month(month) + "-01"
+    cols = list(archive.COLUMN_DTYPES)
+    rows = c.execute(
+        f"SELECT {', '.join(cols)} FROM visits WHERE user_id=? AND timestamp >= ? AND timestamp < ?",
+        (user_id, lo, hi),
+    ).fetchall()
+    if not rows:
+        return 0
+    data = dict(zip(cols, (list(col) for col in zip(*rows))))
+    data["timestamp"] = [datetime.strptime(ts, TS_FORMAT) for ts in data["timestamp"]]
+    archive.write_partition(user_id, month, data)
+    c.execute("DELETE FROM visits WHERE user_id=? AND timestamp >= ? AND timestamp < ?", (user_id, lo, hi))
+    _record_change(c, "visits", user_id)
+    return len(rows)
+
+
+def _next_month(month):
+    year, mon = int(month[:4]), int(month[5:])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def _insert_visit_rows(c, rows):
+    # rows: tuples in VISIT_COLUMNS order; runs inside the writer's transaction.
+    # returns the cohorts whose percentile sketches changed
+    c.executemany(
+        f"INSERT INTO visits ({', '.join(VISIT_COLUMNS)}) VALUES ({', '.join('?' * len(VISIT_COLUMNS))})",
+        rows,
+    )
+    c.executemany(
+        "INSERT INTO change_log (kind, user_id) VALUES ('visits', ?)",
+        [(user_id,) for user_id in {row[1] for row in rows}],
+    )
+    visits = [dict(zip(VISIT_COLUMNS, row)) for row in rows]
+    badges.update_states(c, visits)
+    rollup.update_rollups(c, visits)
+    for user_id in anomaly.update(c, visits):
+        _record_change(c, "alerts", user_id)
+    cohorts = cohort.update(c, visits)
+    for key in cohorts:
+        _record_change(c, "cohort", key)
+    return cohorts
+
+
+@perf.timed("db.get_visit_rollup")
+def get_visit_rollup(user_id, start, end, resolution):
+    # one row per day/week bucket with mean/min/max of each score, oldest first
+    key = ("rollup", start, end, resolution)
+    return query_cache.get_or_load(
+        ("visits", user_id), key, lambda: _load_rollup(user_id, start, end, resolution)
+    )
+
+
+def _load_rollup(user_id, start, end, resolution):
+    params = (user_id, rollup.bucket_of(format_ts(start), resolution), end.strftime("%Y-%m-%d"))
+    with pool.reader() as c:
+        df = pd.read_sql_query(rollup.rollup_query(resolution), c, params=params)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y-%m-%d")
+    return df
+
+
+def _visit_ts(ts):
+    # always stored as TS_FORMAT; the history reads parse it with that exact format
+    if ts is None:
+        return format_ts(datetime.utcnow())
+    return format_ts(parse_ts(ts))
+
+
+def _visit_rows(items):
+    # items: [(user_id, reading)]; readings without scores are scored here in one pass, and
+    # every reading gets its report code in one vectorized pass
+    unscored = [r for _, r in items if "stool_score" not in r]
+    if unscored:
+        scores = score_visit_batch(*([r[k] for r in unscored] for k in READING_KEYS))
+        for i, r in enumerate(unscored):
+            r["stool_score"] = int(scores["stool_score"][i])
+            r["hydrated_score"] = float(scores["hydrated_score"][i])
+            r["nutrition_score"] = float(scores["nutrition_score"][i])
+    codes = report_codes(*([r[k] for _, r in items] for k in REPORT_KEYS)).tolist()
+    visit_ids = [uuid.uuid4().hex for _ in items]
+    rows = []
+    for visit_id, (user_id, r), code in zip(visit_ids, items, codes):
+        rows.append((
+            visit_id, user_id, _visit_ts(r.get("timestamp")),
+            r["ph"], r["protein"], r["glucose"], r["color_score"], r["temp"],
+            r["stool_score"], r["hydrated_score"], r["nutrition_score"], code,
+        ))
+    return visit_ids, rows
+
+
+@perf.timed("db.log_visits")
+def log_visits(items, batch_size=LOG_BATCH_SIZE, award_badges=True):
+    # items: iterable of (user_id, reading); one transaction per batch, badges evaluated
+    # once per user per batch instead of once per visit. returns the new visit_ids in order.
+    all_ids = []
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            all_ids.extend(_log_visit_batch(batch, award_badges))
+            batch = []
+    if batch:
+        all_ids.extend(_log_visit_batch(batch, award_badges))
+    return all_ids
+
+
+def _log_visit_batch(batch, award_badges):
+    visit_ids, rows = _visit_rows(batch)
+    cohorts = pool.write(lambda c: _insert_visit_rows(c, rows))
+    perf.count("visits.logged", len(rows))
+    for key in cohorts:
+        query_cache.invalidate(("cohort", key))
+    for user_id in dict.fromkeys(user_id for user_id, _ in batch):
+        query_cache.invalidate(("visits", user_id))
+        query_cache.invalidate(("alerts", user_id))
+        if award_badges:
+            award_badge_if_eligible(user_id)
+    return visit_ids
+
+
+# ---------------------------
+# cohort percentiles (see cohort.py)
+# ---------------------------
+@perf.timed("db.get_cohort_rank")
+def get_cohort_rank(user_id):
+    # percentile of the user's latest scores within their age/gender cohort over the
+    # cohort.WINDOW_DAYS ending on that visit's day; None without a profile or visits
+    user = get_user(user_id)
+    latest = get_latest_visit(user_id)
+    if user is None or latest is None:
+        return None
+    key = cohort.cohort_of(user["age"], user["gender"])
+    return query_cache.get_or_load(
+        ("cohort", key), ("rank", user_id, latest["visit_id"]), lambda: _load_cohort_rank(key, latest)
+    )
+
+
+def _load_cohort_rank(key, latest):
+    with pool.reader() as c:
+        n, sketch = cohort.window_sketch(c, key, f"{latest['timestamp']:%Y-%m-%d}")
+    rank = {"cohort": cohort.cohort_label(key), "visits": n}
+    for m in cohort.METRICS:
+        rank[m] = cohort.percentile(sketch[m], latest[m])
+    return rank
+
+
+# ---------------------------
+# alerts (personal-baseline anomalies, see anomaly.py)
+# ---------------------------
+@perf.timed("db.get_alerts")
+def get_alerts(user_id, limit=5):
+    return query_cache.get_or_load(("alerts", user_id), limit, lambda: _load_alerts(user_id, limit))
+
+
+def _load_alerts(user_id, limit):
+    with pool.reader() as c:
+        df = pd.read_sql_query(
+            "SELECT visit_id, timestamp, metric, value, baseline, z, message FROM alerts "
+            "WHERE user_id=? ORDER BY timestamp DESC LIMIT ?",
+            c, params=(user_id, int(limit)),
+        )
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=TS_FORMAT)
+    return df
+
+
+# ---------------------------
+# badges
+# ---------------------------
+@perf.timed("db.get_badges")
+def get_badges(user_id):
+    return query_cache.get_or_load(("badges", user_id), (), lambda: _load_badges(user_id))
+
+
+def _load_badges(user_id):
+    with pool.reader() as c:
+        return pd.read_sql_query(
+            "SELECT badge_name, awarded_at FROM badges WHERE user_id=? ORDER BY awarded_at", c, params=(user_id,)
+        )
+
+
+@perf.timed("db.award_badge_if_eligible")
+def award_badge_if_eligible(user_id):
+    # rules read the running state kept by badges.update_states; constant time per call
+    with pool.reader() as c:
+        state = badges.load_state(c, user_id)
+    earned = badges.earned_badges(state) if state else []
+    if not earned:
+        return []
+    awarded_at = format_ts(datetime.utcnow())
+    new = pool.write(lambda c: _insert_badges(c, user_id, earned, awarded_at))
+    if new:
+        perf.count("badges.awarded", len(new))
+        query_cache.invalidate(("badges", user_id))
+    return new
+
+
+def _insert_badges(c, user_id, earned, awarded_at):
+    # awards kept from earlier runs are left alone; returns the newly awarded names
+    new = []
+    for name in earned:
+        cur = c.execute("INSERT OR IGNORE INTO badges (user_id, badge_name, awarded_at) VALUES (?,?,?)", (user_id, name, awarded_at))
+        if cur.rowcount:
+            new.append(name)
+    if new:
+        _record_change(c, "badges", user_id)
+    return new
+
+
+def rebuild_badge_states(user_ids=None):
+    # replays history into badge_state, e.g. after a rule or accumulator change
+    if user_ids is None:
+        with pool.reader() as c:
+            user_ids = [row[0] for row in c.execute("SELECT user_id FROM users")]
+    for user_id in user_ids:
+        pool.write(lambda c, user_id=user_id: badges.rebuild_state(c, user_id))
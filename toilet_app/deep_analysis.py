@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .db import TS_FORMAT, pool
+
+# ---------------------------
+# "심층 AI 분석" background worker
+# ---------------------------
+# analysis runs on a process-wide worker pool, never on the Streamlit thread. results are
+# persisted per visit_id, so a visit is analyzed once no matter how many sessions ask.
+# swap ANALYZER for a heavier model; it receives the visit and a progress(0..1) callback.
+
+WORKERS = int(os.environ.get("TOILET_ANALYSIS_WORKERS", "2"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deep_analysis (
+    visit_id TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    finished_at TEXT NOT NULL
+)
+"""
+
+
+def simulated_analyzer(visit, progress):
+    deeper = []
+    progress(0.2)
+    if visit["protein"] > 0.6:
+        deeper.append("고단백 식단이 장기간 지속되면 신장 부담 가능 — 단백질 섭취량을 1주간 조정해 보세요.")
+    progress(0.5)
+    if visit["glucose"] > 0.4:
+        deeper.append("소변 당 상승 소견: 혈당 체크 권장.")
+    progress(0.8)
+    if visit["stool_score"] < 50:
+        deeper.append("장내 미생물 다양성 개선을 위한 프로바이오틱스/식이섬유 권장(의사 상담 권고).")
+    if not deeper:
+        deeper.append("심층 이상 없음 — 현재 상태 유지 권고.")
+    return deeper
+
+
+ANALYZER = simulated_analyzer
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="deep-analysis")
+_lock = threading.Lock()
+_jobs = {}  # visit_id -> {"future", "progress", "started", "error"}
+
+pool.write(lambda c: c.execute(SCHEMA))
+
+
+def get_result(visit_id):
+    with pool.reader() as c:
+        row = c.execute("SELECT result FROM deep_analysis WHERE visit_id=?", (visit_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _run(visit_id, visit):
+    job = _jobs[visit_id]
+
+    def progress(p):
+        job["progress"] = float(p)
+
+    try:
+        result = ANALYZER(visit, progress)
+        pool.write(lambda c: c.execute(
+            "INSERT OR REPLACE INTO deep_analysis (visit_id, result, finished_at) VALUES (?,?,?)",
+            (visit_id, json.dumps(result, ensure_ascii=False), datetime.utcnow().strftime(TS_FORMAT)),
+        ))
+    except Exception as exc:
+        # keep the failed job around so the UI can show it; submit() retries
+        job["error"] = str(exc)
+        return None
+    with _lock:
+        _jobs.pop(visit_id, None)
+    return result
+
+
+def submit(visit):
+    # visit: mapping with visit_id and sensor/score fields; no-op if cached or already running
+    visit_id = visit["visit_id"]
+    with _lock:
+        job = _jobs.get(visit_id)
+        if job is not None and "error" not in job:
+            return
+        if get_result(visit_id) is not None:
+            return
+        _jobs[visit_id] = {"progress": 0.0, "started": time.monotonic()}
+        _jobs[visit_id]["future"] = _executor.submit(_run, visit_id, dict(visit))
+
+
+def status(visit_id):
+    # ("done", findings) | ("running", progress) | ("failed", message) | (None, None)
+    with _lock:
+        job = _jobs.get(visit_id)
+    if job is not None:
+        if "error" in job:
+            return "failed", job["error"]
+        return "running", job["progress"]
+    result = get_result(visit_id)
+    if result is not None:
+        return "done", result
+    return None, None
@@ -0,0 +1,47 @@
+from bisect import bisect_left
+
+# ---------------------------
+# User directory
+# ---------------------------
+# built once per change to the users table (cached under the ("users",) tag): an id ->
+# profile dict for O(1) lookups and a nickname-sorted index for prefix search, so the
+# sidebar only ever materializes one page of users.
+
+PAGE_SIZE = 50
+
+
+class UserDirectory:
+    def __init__(self, users):
+        # users: iterable of dicts with user_id, nickname, age, gender
+        self.by_id = {u["user_id"]: u for u in users}
+        self._index = sorted((u["nickname"].casefold(), u["user_id"]) for u in self.by_id.values())
+        self._keys = [k for k, _ in self._index]
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, user_id):
+        return user_id in self.by_id
+
+    def get(self, user_id):
+        return self.by_id.get(user_id)
+
+    def nickname(self, user_id):
+        return self.by_id[user_id]["nickname"]
+
+    def _range(self, prefix):
+        prefix = prefix.strip().casefold()
+        lo = bisect_left(self._keys, prefix)
+        # every key starting with prefix sorts before prefix + the highest code point
+        hi = bisect_left(self._keys, prefix + "\U0010ffff", lo) if prefix else len(self._keys)
+        return lo, hi
+
+    def count(self, prefix=""):
+        lo, hi = self._range(prefix)
+        return hi - lo
+
+    def search(self, prefix="", offset=0, limit=PAGE_SIZE):
+        # user_ids whose nickname starts with prefix (case-insensitive), in nickname order
+        lo, hi = self._range(prefix)
+        start = lo + max(offset, 0)
+        return [user_id for _, user_id in self._index[start:min(start + limit, hi)]]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# Chart downsampling
+# ---------------------------
+# Altair embeds every row in the page, so series are capped to a point budget before
+# charting. min/max bucketing keeps every bucket's extremes (spikes stay visible);
+# LTTB keeps the visual shape with fewer points.
+
+CHART_WIDTH_PX = 900
+PX_PER_POINT = 2
+
+
+def point_budget(width_px=CHART_WIDTH_PX):
+    return max(int(width_px // PX_PER_POINT), 10)
+
+
+def minmax_indices(y, budget):
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+    buckets = max((budget - 2) // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    idx = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        seg = y[lo:hi]
+        idx.append(lo + int(np.argmin(seg)))
+        idx.append(lo + int(np.argmax(seg)))
+    return np.unique(idx)
+
+
+def lttb_indices(x, y, budget):
+    # largest-triangle-three-buckets; x must be numeric and sorted
+    n = len(y)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    idx = np.empty(budget, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else x[n - 1]
+        avg_y = y[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else y[n - 1]
+        if hi <= lo:
+            idx[i + 1] = a
+            continue
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return np.unique(idx)
+
+
+def downsample_long(df, x, columns, budget, method="minmax"):
+    # returns a long frame (x, metric, value) with at most ~budget points per column
+    xs = df[x].to_numpy()
+    x_num = xs.astype("datetime64[ns]").astype(np.int64).astype(np.float64) if np.issubdtype(xs.dtype, np.datetime64) else xs.astype(np.float64)
+    parts = []
+    for col in columns:
+        y = df[col].to_numpy(dtype=np.float64)
+        if method == "lttb":
+            idx = lttb_indices(x_num, y, budget)
+        else:
+            idx = minmax_indices(y, budget)
+        parts.append(pd.DataFrame({x: xs[idx], "metric": col, "value": y[idx]}))
+    return pd.concat(parts, ignore_index=True)
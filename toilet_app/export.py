@@ -0,0 +1,307 @@
+import argparse
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from . import archive
+from .scoring import REPORT_LINES, REPORT_OK, SCORE_KEYS, VISIT_SCORE_KEYS, render_report
+from .shard import IN_FLIGHT, WORKERS
+
+# ---------------------------
+# Periodic report export
+# ---------------------------
+# renders one weekly or monthly report (chart PNG + markdown summary) per user for the
+# maintenance window:
+#
+#   python -m toilet_app.export --period month --out exports --workers 8
+#
+# the parent reads the whole period in one pass (visits ORDER BY user_id, timestamp, merged
+# with archived users in the same user order) and hands batches of users to a process pool.
+# each worker keeps one Agg Figure and redraws it per user instead of building a new one.
+# export_state remembers (visit count, last visit) per user and period, so a rerun only
+# renders users with new visits. as in shard.py, workers never import .db.
+
+EXPORT_DIR = os.environ.get("TOILET_EXPORT_DIR", "exports")
+EXPORT_BATCH_USERS = 200
+SENSOR_KEYS = ["ph", "protein", "glucose", "color_score"]
+EXPORT_COLUMNS = VISIT_SCORE_KEYS + SENSOR_KEYS + ["report_code"]
+# chart labels stay ASCII: the Agg default font has no Hangul glyphs
+CHART_LABELS = {"stool_score": "stool", "hydrated_score": "hydration", "nutrition_score": "nutrition"}
+PERIOD_NAMES = {"week": "주간", "month": "월간"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS export_state (
+    user_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    last_ts TEXT NOT NULL,
+    exported_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, period)
+)
+"""
+
+
+def period_bounds(kind, day):
+    # (label, start, end) of the week (Monday start) or month containing day; end is exclusive
+    if kind == "week":
+        start = day - timedelta(days=day.weekday())
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}", start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start.strftime("%Y-%m"), start, end
+
+
+def last_complete_period(kind, today):
+    _, start, _ = period_bounds(kind, today)
+    return period_bounds(kind, start - timedelta(days=1))
+
+
+# ---------------------------
+# worker side
+# ---------------------------
+_figure = None
+
+
+def _get_figure():
+    # one figure per worker process, cleared and redrawn for every user
+    global _figure
+    if _figure is None:
+        _figure = Figure(figsize=(8, 6), dpi=100)
+        _figure.subplots(2, 1, sharex=True)
+    return _figure
+
+
+def _daily(ts, cols):
+    days = ts.astype("datetime64[D]")
+    uniq, inv = np.unique(days, return_inverse=True)
+    counts = np.bincount(inv)
+    means = {k: np.bincount(inv, weights=cols[k]) / counts for k in VISIT_SCORE_KEYS}
+    return uniq, counts, means
+
+
+def _draw_chart(path, user_id, label, cols):
+    fig = _get_figure()
+    scores, visits = fig.axes
+    scores.clear()
+    visits.clear()
+    days, counts, means = _daily(cols["timestamp"], cols)
+    for k in VISIT_SCORE_KEYS:
+        scores.plot(days, means[k], marker="o", markersize=3, label=CHART_LABELS[k])
+    scores.set_ylim(0, 100)
+    scores.set_ylabel("daily mean score")
+    scores.legend(loc="lower left", fontsize=8)
+    scores.grid(alpha=0.3)
+    visits.bar(days, counts, width=0.8, color="tab:gray")
+    visits.set_ylabel("visits")
+    visits.grid(alpha=0.3, axis="y")
+    fig.suptitle(f"{user_id}  {label}")
+    fig.autofmt_xdate()
+    fig.savefig(path)
+
+
+def _summary(task, label, start, end):
+    cols = task["cols"]
+    n = len(cols["timestamp"])
+    codes = np.asarray(cols["report_code"], dtype=np.int64)
+    lines = [
+        f"# {task['nickname']} 님의 {PERIOD_NAMES[task['kind']]} 건강 리포트 ({label})",
+        "",
+        f"- 기간: {start.isoformat()} ~ {(end - timedelta(days=1)).isoformat()}",
+        f"- 방문 수: {n}회",
+        "",
+        "| 항목 | 평균 | 최저 | 최고 |",
+        "| --- | --- | --- | --- |",
+    ]
+    for name, k in zip(SCORE_KEYS, VISIT_SCORE_KEYS):
+        v = np.asarray(cols[k], dtype=np.float64)
+        lines.append(f"| {name} | {v.mean():.1f} | {v.min():.1f} | {v.max():.1f} |")
+    lines += ["", "## 센서 평균", ""]
+    lines += [f"- {k}: {np.mean(cols[k]):.2f}" for k in SENSOR_KEYS]
+    lines += ["", "## 주요 권고", ""]
+    flagged = [(int(np.count_nonzero(codes & (1 << i))), text) for i, text in enumerate(REPORT_LINES)]
+    flagged = sorted((f for f in flagged if f[0]), key=lambda f: -f[0])
+    lines += [f"- {text} ({k}/{n}회)" for k, text in flagged] or [f"- {REPORT_OK}"]
+    lines += ["", "## 최근 리포트", "", render_report(codes[-1]), "", "## 획득 배지", ""]
+    lines += [f"- 🏅 {name} ({awarded_at[:10]})" for name, awarded_at in task["badges"]] or ["- 이번 기간에 획득한 배지가 없습니다."]
+    lines += ["", f"![chart]({task['user_id']}.png)", ""]
+    return "\n".join(lines)
+
+
+def render_batch(tasks, out_dir, label, start, end):
+    # runs in a worker; returns (user_id, n, last_ts) for every report written
+    done = []
+    for task in tasks:
+        user_id = task["user_id"]
+        _draw_chart(os.path.join(out_dir, f"{user_id}.png"), user_id, label, task["cols"])
+        with open(os.path.join(out_dir, f"{user_id}.md"), "w", encoding="utf-8") as f:
+            f.write(_summary(task, label, start, end))
+        done.append((user_id, task["n"], task["last_ts"]))
+    return done
+
+
+# ---------------------------
+# parent side
+# ---------------------------
+def _ts(d):
+    return datetime(d.year, d.month, d.day).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _user_columns(user_id, hot_rows, start, end, archived):
+    # one user's period as numpy columns: archived rows first (always older), then hot rows
+    parts = []
+    if archived:
+        cold = archive.read_columns(user_id, EXPORT_COLUMNS, np.datetime64(start, "us"), np.datetime64(end, "us") - 1)
+        if len(cold["timestamp"]):
+            parts.append(cold)
+    if hot_rows:
+        values = list(zip(*hot_rows))
+        hot = {"timestamp": np.array(values[1], dtype="datetime64[us]")}
+        for k, v in zip(EXPORT_COLUMNS, values[2:]):
+            hot[k] = np.array(v, dtype=np.float64)
+        parts.append(hot)
+    if not parts:
+        return None
+    return {k: np.concatenate([np.asarray(p[k]) for p in parts]) for k in ["timestamp"] + EXPORT_COLUMNS}
+
+
+def stream_users(start, end):
+    # yields (user_id, columns) for every user with visits in [start, end), in user_id order,
+    # from one ordered scan of visits plus the archive users in the same order
+    from .db import pool
+
+    with pool.reader() as c:
+        rows = c.execute(
+            f"SELECT user_id, timestamp, {', '.join(EXPORT_COLUMNS)} FROM visits "
+            "WHERE timestamp >= ? AND timestamp < ? ORDER BY user_id, timestamp",
+            (_ts(start), _ts(end)),
+        )
+        cold = iter(archive.list_users())
+        next_cold = next(cold, None)
+        for user_id, group in groupby(rows, key=itemgetter(0)):
+            while next_cold is not None and next_cold < user_id:
+                cols = _user_columns(next_cold, None, start, end, True)
+                if cols is not None:
+                    yield next_cold, cols
+                next_cold = next(cold, None)
+            archived = next_cold == user_id
+            if archived:
+                next_cold = next(cold, None)
+            yield user_id, _user_columns(user_id, list(group), start, end, archived)
+    while next_cold is not None:
+        cols = _user_columns(next_cold, None, start, end, True)
+        if cols is not None:
+            yield next_cold, cols
+        next_cold = next(cold, None)
+
+
+def _save_state(period, done):
+    from .db import pool
+
+    exported_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+    pool.write(lambda c: c.executemany(
+        "INSERT OR REPLACE INTO export_state (user_id, period, n, last_ts, exported_at) VALUES (?,?,?,?,?)",
+        [(user_id, period, n, last_ts, exported_at) for user_id, n, last_ts in done],
+    ))
+    return len(done)
+
+
+def _write_index(out_dir, period, nicknames):
+    from .db import pool
+
+    with pool.reader() as c:
+        rows = c.execute(
+            "SELECT user_id, n, last_ts, exported_at FROM export_state WHERE period=? ORDER BY user_id", (period,)
+        ).fetchall()
+    with open(os.path.join(out_dir, "index.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["user_id", "nickname", "visits", "last_visit", "exported_at"])
+        for user_id, n, last_ts, exported_at in rows:
+            writer.writerow([user_id, nicknames.get(user_id, ""), n, last_ts, exported_at])
+
+
+def export(kind="month", day=None, out=EXPORT_DIR, workers=WORKERS, batch_users=EXPORT_BATCH_USERS, force=False):
+    # returns (reports written, users skipped as unchanged)
+    from .db import pool
+
+    pool.write(lambda c: c.execute(SCHEMA))
+    label, start, end = period_bounds(kind, day) if day else last_complete_period(kind, date.today())
+    period = f"{kind}:{label}"
+    out_dir = os.path.join(out, label)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with pool.reader() as c:
+        nicknames = dict(c.execute("SELECT user_id, nickname FROM users"))
+        previous = {} if force else {
+            user_id: (n, last_ts)
+            for user_id, n, last_ts in c.execute("SELECT user_id, n, last_ts FROM export_state WHERE period=?", (period,))
+        }
+        badges = {}
+        for user_id, name, awarded_at in c.execute(
+            "SELECT user_id, badge_name, awarded_at FROM badges WHERE awarded_at >= ? AND awarded_at < ? "
+            "ORDER BY user_id, awarded_at",
+            (_ts(start), _ts(end)),
+        ):
+            badges.setdefault(user_id, []).append((name, awarded_at))
+
+    written = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        batch = []
+
+        def submit():
+            pending.append(executor.submit(render_batch, list(batch), out_dir, label, start, end))
+            batch.clear()
+
+        for user_id, cols in stream_users(start, end):
+            last_ts = np.datetime_as_string(cols["timestamp"].max(), unit="us").replace("T", " ")
+            n = len(cols["timestamp"])
+            if previous.get(user_id) == (n, last_ts):
+                skipped += 1
+                continue
+            batch.append({
+                "user_id": user_id,
+                "nickname": nicknames.get(user_id, user_id),
+                "kind": kind,
+                "n": n,
+                "last_ts": last_ts,
+                "cols": cols,
+                "badges": badges.get(user_id, []),
+            })
+            if len(batch) >= batch_users:
+                submit()
+                while len(pending) > workers * IN_FLIGHT:
+                    written += _save_state(period, pending.popleft().result())
+        if batch:
+            submit()
+        while pending:
+            written += _save_state(period, pending.popleft().result())
+    _write_index(out_dir, period, nicknames)
+    return written, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user periodic health report export")
+    parser.add_argument("--period", choices=["week", "month"], default="month")
+    parser.add_argument("--date", type=date.fromisoformat, help="any day in the period (default: last complete period)")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--batch-users", type=int, default=EXPORT_BATCH_USERS)
+    parser.add_argument("--force", action="store_true", help="re-render users whose visits did not change")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written, skipped = export(args.period, args.date, args.out, args.workers, args.batch_users, args.force)
+    print(f"exported {written} reports ({skipped} unchanged) with {args.workers} workers in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from . import perf
+from .db import TS_FORMAT, archive_cold_visits, get_users, log_visits, parse_ts, prune_change_log, save_facility_stats
+from .scoring import READING_KEYS
+from .stalls import STALL_EVENTS, StallTracker
+
+# ---------------------------
+# Sensor ingestion service
+# ---------------------------
+# devices (or the Streamlit "물 내리기" button) emit raw sensor events; this service
+# micro-batches them, scores each batch in one vectorized pass and writes it in bulk.
+# the Streamlit app only reads the results.
+#
+#   python -m toilet_app.ingest --source tail --spool events.jsonl
+#   python -m toilet_app.ingest --source simulate --toilets 200 --rate 50
+#
+# sensor event: {"user_id", "toilet_id", "timestamp" (TS_FORMAT or ISO 8601, optional), ph, protein, glucose, color_score, temp}
+# stall event:  {"type": "enter" | "flush" | "exit", "toilet_id", "floor", "timestamp"}; these feed
+#               the facility StallTracker, whose snapshot is saved every SNAPSHOT_INTERVAL seconds
+
+SPOOL_PATH = os.environ.get("TOILET_EVENT_SPOOL", "sensor_events.jsonl")
+BATCH_SIZE = 500
+BATCH_WAIT = 0.5
+# how often the service moves cold months into the columnar archive (seconds)
+ARCHIVE_INTERVAL = 3600
+# how often live stall stats are written for the "화장실 방문 기록" page (seconds)
+SNAPSHOT_INTERVAL = 5
+STALLS_PER_FLOOR = 20
+EPOCH = datetime(1970, 1, 1)
+
+
+def emit_event(event, path=SPOOL_PATH):
+    # device stand-in: append one event line to the spool the service tails
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def simulate_raw_reading():
+    return {
+        "ph": round(random.uniform(5.5, 8.0), 2),
+        "protein": round(random.uniform(0, 1), 2),
+        "glucose": round(random.uniform(0, 1), 2),
+        "color_score": round(random.uniform(0, 1), 2),
+        "temp": round(random.uniform(35.5, 38.0), 1),
+    }
+
+
+# ---------------------------
+# sources: yield events, or None when idle so the batcher can flush on time
+# ---------------------------
+def _offset_path(path):
+    return path + ".offset"
+
+
+def load_offset(path):
+    try:
+        with open(_offset_path(path), encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def save_offset(path, offset):
+    tmp = _offset_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(str(offset))
+    os.replace(tmp, _offset_path(path))
+
+
+def tail_events(path, poll=0.2):
+    # resumes from the offset saved after the last committed batch
+    with open(path, "a+", encoding="utf-8") as f:
+        f.seek(load_offset(path))
+        partial = ""
+        while True:
+            line = f.readline()
+            if not line:
+                yield None
+                time.sleep(poll)
+                continue
+            partial += line
+            if not partial.endswith("\n"):
+                continue
+            try:
+                event = json.loads(partial)
+            except json.JSONDecodeError:
+                event = None
+            if isinstance(event, dict):
+                event["_spool_offset"] = f.tell()
+                yield event
+            else:
+                print(f"skip malformed event: {partial.strip()[:80]}")
+            partial = ""
+
+
+def invalid_reason(event):
+    # None for an event the service can store, else why it is skipped; checked before the
+    # write so one bad event cannot fail (and on restart, replay) its whole batch
+    if event.get("type") in STALL_EVENTS:
+        if not isinstance(event.get("toilet_id"), str) or not event["toilet_id"]:
+            return "missing toilet_id"
+    else:
+        if not isinstance(event.get("user_id"), str) or not event["user_id"]:
+            return "missing user_id"
+        for k in READING_KEYS:
+            value = event.get(k)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                return f"bad {k}: {value!r}"
+    ts = event.get("timestamp")
+    if ts is not None:
+        try:
+            parse_ts(ts)
+        except ValueError:
+            return f"bad timestamp: {ts!r}"
+    return None
+
+
+def event_time(event):
+    # epoch seconds of an event's (UTC) timestamp; now if it has none
+    ts = event.get("timestamp")
+    if ts is None:
+        return time.time()
+    return (parse_ts(ts) - EPOCH).total_seconds()
+
+
+def stall_event(kind, toilet_id, floor, user_id=None, at=None):
+    at = datetime.utcnow() if at is None else at
+    return {"type": kind, "toilet_id": toilet_id, "floor": floor, "user_id": user_id, "timestamp": at.strftime(TS_FORMAT)}
+
+
+def simulated_events(user_ids, toilets=100, rate=20.0):
+    # rate: visits per second across the whole fleet; each visit is enter, flush (mostly),
+    # the sensor reading and exit, with a simulated dwell time
+    interval = 1.0 / rate
+    while True:
+        stall = random.randrange(toilets)
+        toilet_id = f"T{stall:05d}"
+        floor = f"{stall // STALLS_PER_FLOOR + 1}F"
+        user_id = random.choice(user_ids)
+        now = datetime.utcnow()
+        yield stall_event("enter", toilet_id, floor, user_id, now - timedelta(seconds=random.lognormvariate(5.3, 0.6)))
+        if random.random() < 0.9:
+            yield stall_event("flush", toilet_id, floor, user_id, now)
+        event = simulate_raw_reading()
+        event["user_id"] = user_id
+        event["toilet_id"] = toilet_id
+        yield event
+        yield stall_event("exit", toilet_id, floor, user_id, now)
+        time.sleep(interval)
+
+
+def micro_batches(events, max_size=BATCH_SIZE, max_wait=BATCH_WAIT):
+    batch = []
+    started = time.monotonic()
+    for event in events:
+        if event is not None:
+            if not batch:
+                started = time.monotonic()
+            batch.append(event)
+        elif not batch and time.monotonic() - started >= max_wait:
+            # idle tick: an empty batch lets the caller run its periodic work
+            yield batch
+            started = time.monotonic()
+            continue
+        if batch and (len(batch) >= max_size or time.monotonic() - started >= max_wait):
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------------------------
+# bulk write (scoring happens in db.log_visits)
+# ---------------------------
+def process_batch(batch, tracker=None):
+    visits = []
+    for e in batch:
+        reason = invalid_reason(e)
+        if reason is not None:
+            print(f"skip invalid event ({reason}): {json.dumps(e, ensure_ascii=False, default=str)[:80]}")
+            perf.count("ingest.invalid_events")
+        elif e.get("type") in STALL_EVENTS:
+            if tracker is not None:
+                tracker.observe_event(e, event_time(e))
+        else:
+            visits.append(e)
+    if not visits:
+        return 0
+    return len(log_visits(((e["user_id"], e) for e in visits), batch_size=len(visits)))
+
+
+def run(events, max_size=BATCH_SIZE, max_wait=BATCH_WAIT, spool=None):
+    total = 0
+    last_archive = 0.0
+    last_snapshot = 0.0
+    tracker = StallTracker()
+    for batch in micro_batches(events, max_size, max_wait):
+        if batch:
+            started = time.perf_counter()
+            n = process_batch(batch, tracker)
+            total += n
+            if spool is not None:
+                save_offset(spool, batch[-1]["_spool_offset"])
+            if n:
+                print(f"ingested {n} visits in {time.perf_counter() - started:.3f}s (total {total})")
+                prune_change_log()
+        if time.monotonic() - last_snapshot >= SNAPSHOT_INTERVAL:
+            now = time.time()
+            tracker.expire_sessions(now)
+            save_facility_stats(tracker.snapshot(now))
+            last_snapshot = time.monotonic()
+        if time.monotonic() - last_archive >= ARCHIVE_INTERVAL:
+            moved = archive_cold_visits()
+            if moved:
+                print(f"archived {moved} cold visits")
+            last_archive = time.monotonic()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart toilet sensor ingestion service")
+    parser.add_argument("--source", choices=["tail", "simulate"], default="tail")
+    parser.add_argument("--spool", default=SPOOL_PATH)
+    parser.add_argument("--toilets", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=20.0)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--batch-wait", type=float, default=BATCH_WAIT)
+    args = parser.parse_args()
+
+    spool = None
+    if args.source == "tail":
+        spool = args.spool
+        events = tail_events(spool)
+    else:
+        user_ids = list(get_users()["user_id"])
+        if not user_ids:
+            parser.error("no users registered; create one in the app first")
+        events = simulated_events(user_ids, args.toilets, args.rate)
+    try:
+        run(events, args.batch_size, args.batch_wait, spool)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
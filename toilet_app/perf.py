@@ -0,0 +1,169 @@
+import csv
+import functools
+import io
+import json
+import math
+import os
+import threading
+import time
+
+# ---------------------------
+# Lightweight timing instrumentation
+# ---------------------------
+# timer("section") / @timed("query") feed per-name latency histograms (log-spaced buckets,
+# fixed memory per name); count("event", n) bumps a named counter (cache hits/misses per
+# query, visits logged, badges awarded, invalid ingest events). while disabled, timer() hands
+# back a shared no-op context, and @timed wrappers and count() cost one flag check.
+
+_enabled = os.environ.get("TOILET_PERF", "") == "1"
+_lock = threading.Lock()
+_stats = {}
+_counters = {}
+
+# bucket i covers [BASE * GROWTH**i, BASE * GROWTH**(i+1)) seconds: 10us .. ~100s
+BASE = 1e-5
+GROWTH = 1.2
+BUCKETS = 90
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _counters.clear()
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, secs):
+        self.count += 1
+        self.total += secs
+        if secs > self.max:
+            self.max = secs
+        i = 0 if secs <= BASE else min(int(math.log(secs / BASE, GROWTH)), BUCKETS - 1)
+        self.buckets[i] += 1
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                # upper edge of the bucket, capped by the observed max
+                return min(BASE * GROWTH ** (i + 1), self.max)
+        return self.max
+
+
+def record(name, secs):
+    with _lock:
+        hist = _stats.get(name)
+        if hist is None:
+            hist = _stats[name] = _Histogram()
+        hist.add(secs)
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Timer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def timer(name):
+    return _Timer(name) if _enabled else _NOOP
+
+
+def timed(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+# ---------------------------
+# export
+# ---------------------------
+def snapshot():
+    with _lock:
+        rows = [
+            {
+                "name": name,
+                "count": h.count,
+                "mean_ms": h.total / h.count * 1000,
+                "p50_ms": h.percentile(50) * 1000,
+                "p95_ms": h.percentile(95) * 1000,
+                "p99_ms": h.percentile(99) * 1000,
+                "max_ms": h.max * 1000,
+            }
+            for name, h in _stats.items()
+        ]
+        counters = dict(_counters)
+    rows.sort(key=lambda r: r["name"])
+    return rows, counters
+
+
+def to_json():
+    rows, counters = snapshot()
+    return json.dumps({"timers": rows, "counters": counters}, ensure_ascii=False, indent=2)
+
+
+def to_csv():
+    rows, _ = snapshot()
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=["name", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue()
@@ -0,0 +1,33 @@
+import importlib
+
+# ---------------------------
+# Page registry
+# ---------------------------
+# pages are registered by module path and imported on first open, so heavy deps a page
+# needs (altair, matplotlib, the DB pool ...) load only when someone visits that page.
+
+
+class Page:
+    def __init__(self, key, label, module):
+        self.key = key
+        self.label = label
+        self.module = module
+
+    def load(self):
+        return importlib.import_module(self.module, __package__)
+
+    def render(self):
+        self.load().render()
+
+
+PAGES = [
+    Page("health", "🚻 건강 관리 (대시보드)", ".views.health"),
+    Page("sensor", "🧪 실시간 센서 데이터 분석", ".views.sensor"),
+    Page("visit_log", "🚪 화장실 방문 기록", ".views.visit_log"),
+    Page("stool_ai", "🤖 💩 AI 건강 분석", ".views.stool_ai"),
+    Page("weekly", "📊 최근 건강 리포트", ".views.weekly"),
+    Page("trend", "📈 장기 추세 리포트", ".views.trend"),
+    Page("perf", "⏱️ 성능 패널 (관리자)", ".views.perf"),
+]
+
+PAGES_BY_KEY = {p.key: p for p in PAGES}
@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import archive
+
+# ---------------------------
+# Daily / weekly rollups of visit scores
+# ---------------------------
+# maintained incrementally by the visit insert (same transaction), so range charts read
+# one row per day or week instead of every raw visit.
+
+METRICS = ["stool_score", "hydrated_score", "nutrition_score"]
+RESOLUTIONS = {"day": "visit_rollup_day", "week": "visit_rollup_week"}
+
+# raw visits up to a month, daily buckets up to two years, weekly beyond that
+RAW_MAX_DAYS = 31
+DAILY_MAX_DAYS = 730
+
+
+def _metric_columns():
+    cols = []
+    for m in METRICS:
+        cols += [f"{m}_sum REAL", f"{m}_min REAL", f"{m}_max REAL"]
+    return ", ".join(cols)
+
+
+SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {table} (
+        user_id TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        {_metric_columns()},
+        PRIMARY KEY (user_id, bucket)
+    )"""
+    for table in RESOLUTIONS.values()
+]
+
+
+def bucket_of(ts, resolution):
+    # ts: TS_FORMAT string; bucket is the day, or the Monday starting its week
+    day = ts[:10]
+    if resolution == "day":
+        return day
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+def pick_resolution(start, end):
+    days = (end - start).days + 1
+    if days <= RAW_MAX_DAYS:
+        return "raw"
+    if days <= DAILY_MAX_DAYS:
+        return "day"
+    return "week"
+
+
+def _aggregate(visits, resolution):
+    acc = {}
+    for v in visits:
+        key = (v["user_id"], bucket_of(v["timestamp"], resolution))
+        a = acc.get(key)
+        if a is None:
+            a = acc[key] = [0] + [x for m in METRICS for x in (0.0, v[m], v[m])]
+        a[0] += 1
+        for i, m in enumerate(METRICS):
+            x = v[m]
+            a[1 + 3 * i] += x
+            a[2 + 3 * i] = min(a[2 + 3 * i], x)
+            a[3 + 3 * i] = max(a[3 + 3 * i], x)
+    return acc
+
+
+def _upsert_sql(table):
+    cols = ["n"] + [f"{m}_{s}" for m in METRICS for s in ("sum", "min", "max")]
+    updates = ["n = n + excluded.n"]
+    for m in METRICS:
+        updates += [
+            f"{m}_sum = {m}_sum + excluded.{m}_sum",
+            f"{m}_min = MIN({m}_min, excluded.{m}_min)",
+            f"{m}_max = MAX({m}_max, excluded.{m}_max)",
+        ]
+    return (
+        f"INSERT INTO {table} (user_id, bucket, {', '.join(cols)}) "
+        f"VALUES ({', '.join('?' * (len(cols) + 2))}) "
+        f"ON CONFLICT(user_id, bucket) DO UPDATE SET {', '.join(updates)}"
+    )
+
+
+def update_rollups(c, visits):
+    # visits: dicts with user_id, timestamp and METRICS, inserted in this transaction
+    for resolution, table in RESOLUTIONS.items():
+        acc = _aggregate(visits, resolution)
+        c.executemany(_upsert_sql(table), [key + tuple(vals) for key, vals in acc.items()])
+
+
+def _bucket_sql(resolution):
+    if resolution == "day":
+        return "substr(timestamp, 1, 10)"
+    return "date(substr(timestamp, 1, 10), 'weekday 0', '-6 days')"
+
+
+def rebuild_rollups(c, user_id=None):
+    where, params = ("WHERE user_id=?", (user_id,)) if user_id else ("", ())
+    aggs = ", ".join(f"SUM({m}), MIN({m}), MAX({m})" for m in METRICS)
+    for resolution, table in RESOLUTIONS.items():
+        c.execute(f"DELETE FROM {table} {where}", params)
+        c.execute(
+            f"INSERT INTO {table} SELECT user_id, {_bucket_sql(resolution)} AS bucket, COUNT(*), {aggs} "
+            f"FROM visits {where} GROUP BY user_id, bucket",
+            params,
+        )
+    # archived months are folded in on top of the hot rows
+    for uid in ([user_id] if user_id else archive.list_users()):
+        visits = list(archive.iter_visits(uid, METRICS))
+        if visits:
+            update_rollups(c, visits)
+
+
+def rollup_rows(user_ids, timestamps, values):
+    # _aggregate over columns (datetime64 timestamps, {metric: scores}), for bulk rebuilds;
+    # {resolution: rows in table column order}
+    days = np.asarray(timestamps).astype("datetime64[D]")
+    # 1970-01-01 was a Thursday: step back to the Monday of each day's week
+    weeks = days - (days.astype(np.int64) + 3) % 7
+    aggs = {"n": (METRICS[0], "size")}
+    aggs.update({f"{m}_{s}": (m, s) for m in METRICS for s in ("sum", "min", "max")})
+    out = {}
+    for resolution, buckets in (("day", days), ("week", weeks)):
+        df = pd.DataFrame({"user_id": user_ids, "bucket": np.datetime_as_string(buckets)})
+        for m in METRICS:
+            df[m] = np.asarray(values[m], dtype=np.float64)
+        agg = df.groupby(["user_id", "bucket"], sort=False).agg(**aggs).reset_index()
+        out[resolution] = list(agg.astype(object).itertuples(index=False, name=None))
+    return out
+
+
+def replace_rollups(c, user_ids, rows):
+    # rows: rollup_rows output covering every visit of user_ids
+    marks = ", ".join("?" * len(user_ids))
+    for resolution, table in RESOLUTIONS.items():
+        c.execute(f"DELETE FROM {table} WHERE user_id IN ({marks})", list(user_ids))
+        c.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * (2 + 1 + 3 * len(METRICS)))})", rows[resolution])
+
+
+def rollup_query(resolution):
+    # mean/min/max per bucket; bucket comes back as the chart's timestamp
+    cols = ", ".join(f"{m}_sum / n AS {m}, {m}_min, {m}_max" for m in METRICS)
+    return (
+        f"SELECT bucket AS timestamp, n AS visits, {cols} FROM {RESOLUTIONS[resolution]} "
+        "WHERE user_id=? AND bucket >= ? AND bucket <= ? ORDER BY bucket"
+    )
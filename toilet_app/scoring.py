@@ -0,0 +1,154 @@
+import functools
+import random
+
+import numpy as np
+
+# -----------------------------
+# 센서 점수 규칙 (실시간 센서 분석 페이지: pH, 단백질, 당, 색상)
+# -----------------------------
+SCORE_KEYS = ["장 건강", "수분 상태", "영양 상태"]
+
+HYDRATED_COLORS = ["밝은 노랑", "투명"]
+
+# advice codes are bit flags so a whole batch fits in one small int array
+ADVICE_GUT = 1
+ADVICE_HYDRATION = 2
+ADVICE_NUTRITION = 4
+
+ADVICE_TEXT = {
+    ADVICE_GUT: "⚠️ 장내 환경이 불균형할 수 있습니다. 식이섬유를 늘려보세요.",
+    ADVICE_HYDRATION: "💧 수분 섭취를 늘리세요. 물을 자주 마시세요.",
+    ADVICE_NUTRITION: "🍗 단백질이나 당 섭취량이 높습니다. 식단 조절을 권장합니다.",
+}
+
+
+def _column(batch, key):
+    return np.asarray(batch[key])
+
+
+def score_batch(batch):
+    # batch: DataFrame or dict of column arrays with keys pH, 단백질, 당, 색상 (온도 optional)
+    ph = _column(batch, "pH").astype(np.float64, copy=False)
+    protein = _column(batch, "단백질").astype(np.float64, copy=False)
+    glucose = _column(batch, "당").astype(np.float64, copy=False)
+    color = _column(batch, "색상")
+
+    gut_ok = (ph >= 6.5) & (ph <= 7.5)
+    hydrated_ok = np.isin(color, HYDRATED_COLORS)
+    nutrition_ok = (protein < 1.5) & (glucose < 1.0)
+
+    gut = np.where(gut_ok, 90, 60).astype(np.int16)
+    hydration = np.where(hydrated_ok, 95, 70).astype(np.int16)
+    nutrition = np.where(nutrition_ok, 90, 65).astype(np.int16)
+
+    # same summation order as np.mean(list(score.values()))
+    overall = (gut.astype(np.float64) + hydration + nutrition) / 3
+
+    advice = (
+        np.where(gut_ok, 0, ADVICE_GUT)
+        | np.where(hydrated_ok, 0, ADVICE_HYDRATION)
+        | np.where(nutrition_ok, 0, ADVICE_NUTRITION)
+    ).astype(np.int8)
+
+    return {
+        "장 건강": gut,
+        "수분 상태": hydration,
+        "영양 상태": nutrition,
+        "overall": overall,
+        "advice_code": advice,
+    }
+
+
+def advice_texts(code):
+    code = int(code)
+    return [text for flag, text in ADVICE_TEXT.items() if code & flag]
+
+
+def analyze_sensor_data(data):
+    # single reading wrapper kept for the per-visit UI; returns (score, overall, advice) as before
+    result = score_batch({k: [data[k]] for k in ("pH", "단백질", "당", "색상")})
+    score = {k: int(result[k][0]) for k in SCORE_KEYS}
+    overall = np.float64(result["overall"][0])
+    advice = advice_texts(result["advice_code"][0])
+    return score, overall, advice
+
+
+# -----------------------------
+# 방문 점수 (수치형 센서: ph, protein, glucose, color_score, temp)
+# -----------------------------
+READING_KEYS = ["ph", "protein", "glucose", "color_score", "temp"]
+VISIT_SCORE_KEYS = ["stool_score", "hydrated_score", "nutrition_score"]
+
+
+def score_visit_batch(ph, protein, glucose, color_score, temp):
+    ph = np.asarray(ph, dtype=np.float64)
+    protein = np.asarray(protein, dtype=np.float64)
+    glucose = np.asarray(glucose, dtype=np.float64)
+    color_score = np.asarray(color_score, dtype=np.float64)
+    temp = np.asarray(temp, dtype=np.float64)
+
+    stool = np.clip(100 - np.abs(ph - 7.0) * 30 - color_score * 40, 0, 100).astype(np.int64)
+    hydrated = np.clip(100 - color_score * 60 - np.maximum(temp - 37.0, 0) * 20, 0, 100)
+    nutrition = np.clip(100 - protein * 40 - glucose * 60, 0, 100)
+    return {"stool_score": stool, "hydrated_score": hydrated, "nutrition_score": nutrition}
+
+
+def score_reading(reading):
+    result = score_visit_batch(*(reading[k] for k in READING_KEYS))
+    reading["stool_score"] = int(result["stool_score"])
+    reading["hydrated_score"] = float(result["hydrated_score"])
+    reading["nutrition_score"] = float(result["nutrition_score"])
+    return reading
+
+
+def simulate_sensor_reading():
+    reading = {
+        "ph": round(random.uniform(5.5, 8.0), 2),
+        "protein": round(random.uniform(0, 1), 2),
+        "glucose": round(random.uniform(0, 1), 2),
+        "color_score": round(random.uniform(0, 1), 2),
+        "temp": round(random.uniform(35.5, 38.0), 1),
+    }
+    return score_reading(reading)
+
+
+# -----------------------------
+# 리포트 템플릿: visits store only report_code (bit i set = REPORT_LINES[i] applies);
+# the text is rendered when displayed
+# -----------------------------
+REPORT_LINES = [
+    "장내 환경(pH)이 불균형합니다. 식이섬유와 발효식품 섭취를 늘려보세요.",
+    "수분이 부족해 보입니다. 하루 1.5~2L의 물을 나눠 마시세요.",
+    "단백질 수치가 높습니다. 단백질 섭취량을 점검하세요.",
+    "당 수치가 높습니다. 당분 섭취를 줄이고 혈당을 확인하세요.",
+    "색상 이상도가 높습니다. 증상이 반복되면 진료를 권장합니다.",
+]
+REPORT_OK = "전반적으로 양호합니다. 현재 생활습관을 유지하세요."
+# inputs of report_codes, in argument order
+REPORT_KEYS = ["ph", "hydrated_score", "protein", "glucose", "color_score"]
+
+
+def report_codes(ph, hydrated_score, protein, glucose, color_score):
+    ph = np.asarray(ph, dtype=np.float64)
+    return (
+        np.where((ph >= 6.5) & (ph <= 7.5), 0, 1)
+        | np.where(np.asarray(hydrated_score, dtype=np.float64) < 70, 2, 0)
+        | np.where(np.asarray(protein, dtype=np.float64) > 0.6, 4, 0)
+        | np.where(np.asarray(glucose, dtype=np.float64) > 0.4, 8, 0)
+        | np.where(np.asarray(color_score, dtype=np.float64) > 0.8, 16, 0)
+    ).astype(np.int8)
+
+
+def report_code(reading):
+    return int(report_codes(*(reading[k] for k in REPORT_KEYS)))
+
+
+@functools.lru_cache(maxsize=None)
+def render_report(code):
+    code = int(code)
+    lines = [text for i, text in enumerate(REPORT_LINES) if code & (1 << i)]
+    return " ".join(lines) if lines else REPORT_OK
+
+
+def generate_report(reading):
+    return render_report(report_code(reading))
@@ -0,0 +1,178 @@
+import numpy as np
+
+# ---------------------------
+# Facility stall tracker
+# ---------------------------
+# consumes enter / flush / exit events per stall and keeps, for every stall, every floor and
+# the whole facility, sliding-window counters over the last WINDOW seconds: finished visits,
+# flush compliance and a dwell-time histogram. each counter is a ring of per-BUCKET rows with
+# a running total, so an event costs O(1) and a query reads the total without touching the
+# event log. memory is fixed per scope (WINDOW / BUCKET rows).
+#
+# event: {"type": "enter" | "flush" | "exit", "toilet_id", "floor" (optional), "timestamp"}
+
+WINDOW = 3600
+BUCKET = 60
+# sessions left open longer than this are dropped on the next enter (missed exit event)
+MAX_DWELL = 2 * 3600
+
+# dwell histogram bin edges in seconds: <1m, 1-3m, 3-5m, 5-10m, 10-20m, 20m+
+DWELL_EDGES = [60, 180, 300, 600, 1200]
+DWELL_LABELS = ["1분 미만", "1-3분", "3-5분", "5-10분", "10-20분", "20분 이상"]
+
+# counter columns: visits, flushed visits, dwell seconds, then one per dwell bin
+VISITS, FLUSHED, DWELL_SUM, HIST = 0, 1, 2, 3
+FIELDS = HIST + len(DWELL_LABELS)
+
+STALL_EVENTS = ("enter", "flush", "exit")
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS facility_stats (
+        scope TEXT PRIMARY KEY,
+        stats TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )""",
+]
+
+
+class WindowCounter:
+    __slots__ = ("rows", "total", "head")
+
+    def __init__(self, window=WINDOW, bucket=BUCKET):
+        self.rows = np.zeros((window // bucket, FIELDS), dtype=np.int64)
+        self.total = np.zeros(FIELDS, dtype=np.int64)
+        self.head = None  # newest bucket number seen
+
+    def advance(self, b):
+        # expire rows older than the window ending at bucket b; amortized O(1) per bucket
+        n = len(self.rows)
+        if self.head is None:
+            self.head = b
+            return
+        if b <= self.head:
+            return
+        for i in range(self.head + 1, min(b, self.head + n) + 1):
+            row = self.rows[i % n]
+            self.total -= row
+            row[:] = 0
+        self.head = b
+
+    def add(self, b, values):
+        self.advance(b)
+        if b <= self.head - len(self.rows):
+            return  # older than the window
+        self.rows[b % len(self.rows)] += values
+        self.total += values
+
+
+class _Scope:
+    __slots__ = ("counter", "occupied", "stalls")
+
+    def __init__(self, window, bucket):
+        self.counter = WindowCounter(window, bucket)
+        self.occupied = 0
+        self.stalls = 0
+
+
+class StallTracker:
+    def __init__(self, window=WINDOW, bucket=BUCKET):
+        self.window = window
+        self.bucket = bucket
+        self.facility = _Scope(window, bucket)
+        self.floors = {}
+        self.stalls = {}
+        self.sessions = {}  # toilet_id -> [entered_at, flushed]
+        self.stall_floor = {}
+
+    def _stall(self, toilet_id, floor):
+        scope = self.stalls.get(toilet_id)
+        if scope is None:
+            scope = self.stalls[toilet_id] = _Scope(self.window, self.bucket)
+            scope.stalls = 1
+            floor = self.stall_floor[toilet_id] = str(floor) if floor is not None else "?"
+            if floor not in self.floors:
+                self.floors[floor] = _Scope(self.window, self.bucket)
+            self.floors[floor].stalls += 1
+            self.facility.stalls += 1
+        return scope
+
+    def _scopes(self, toilet_id):
+        return self.stalls[toilet_id], self.floors[self.stall_floor[toilet_id]], self.facility
+
+    def _set_occupied(self, toilet_id, delta):
+        for scope in self._scopes(toilet_id):
+            scope.occupied += delta
+
+    def observe(self, kind, toilet_id, ts, floor=None):
+        # ts: epoch seconds; events for one stall are expected roughly in order
+        self._stall(toilet_id, floor)
+        session = self.sessions.get(toilet_id)
+        if kind == "enter":
+            if session is None:
+                self._set_occupied(toilet_id, 1)
+            self.sessions[toilet_id] = [ts, False]
+        elif kind == "flush":
+            if session is not None:
+                session[1] = True
+        elif kind == "exit":
+            if session is None:
+                return
+            del self.sessions[toilet_id]
+            self._set_occupied(toilet_id, -1)
+            dwell = max(ts - session[0], 0.0)
+            if dwell > MAX_DWELL:
+                return
+            values = np.zeros(FIELDS, dtype=np.int64)
+            values[VISITS] = 1
+            values[FLUSHED] = int(session[1])
+            values[DWELL_SUM] = int(dwell)
+            values[HIST + int(np.searchsorted(DWELL_EDGES, dwell, side="right"))] = 1
+            b = int(ts // self.bucket)
+            for scope in self._scopes(toilet_id):
+                scope.counter.add(b, values)
+
+    def observe_event(self, event, ts):
+        self.observe(event["type"], event["toilet_id"], ts, event.get("floor"))
+
+    def expire_sessions(self, now):
+        # drop sessions whose exit never arrived; O(open sessions), run occasionally
+        for toilet_id, (entered_at, _) in list(self.sessions.items()):
+            if now - entered_at > MAX_DWELL:
+                del self.sessions[toilet_id]
+                self._set_occupied(toilet_id, -1)
+
+    @staticmethod
+    def _stats(scope, b):
+        scope.counter.advance(b)
+        total = scope.counter.total
+        visits = int(total[VISITS])
+        return {
+            "occupied": scope.occupied,
+            "stalls": scope.stalls,
+            "visits": visits,
+            "flushed": int(total[FLUSHED]),
+            "flush_rate": total[FLUSHED] / visits if visits else None,
+            "mean_dwell": total[DWELL_SUM] / visits if visits else None,
+            "dwell_hist": total[HIST:].tolist(),
+        }
+
+    def stats(self, now, toilet_id=None, floor=None):
+        # live numbers for one stall, one floor, or the whole facility
+        b = int(now // self.bucket)
+        if toilet_id is not None:
+            return self._stats(self.stalls[toilet_id], b)
+        if floor is not None:
+            return self._stats(self.floors[str(floor)], b)
+        return self._stats(self.facility, b)
+
+    def snapshot(self, now):
+        # {scope key: stats} for everything tracked ("facility", "floor:<f>", "stall:<id>")
+        b = int(now // self.bucket)
+        out = {"facility": self._stats(self.facility, b)}
+        for floor, scope in self.floors.items():
+            out[f"floor:{floor}"] = self._stats(scope, b)
+        for toilet_id, scope in self.stalls.items():
+            stats = self._stats(scope, b)
+            stats["floor"] = self.stall_floor[toilet_id]
+            out[f"stall:{toilet_id}"] = stats
+        return out
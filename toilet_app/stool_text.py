@@ -0,0 +1,119 @@
+from collections import deque
+
+# ---------------------------
+# Free-text stool description matcher
+# ---------------------------
+# all keywords of all rules are compiled into one Aho-Corasick automaton, so a note is
+# scanned once regardless of dictionary size and every rule that matches is reported (not
+# just the first). text and keywords are compared with whitespace removed ("물 같" == "물같").
+
+# category: (priority, message, keywords); higher priority findings are listed first
+RULES = {
+    "blood": (100, "🩸 혈변 의심: 가능한 빨리 의사 상담을 받으세요.",
+              ["혈변", "피가", "피섞", "피묻", "피비침", "선홍", "붉은", "빨간", "빨갛"]),
+    "black": (90, "⚫ 흑색변: 상부 위장관 출혈 가능성, 진료를 권장합니다.",
+              ["검은", "검정", "까만", "까맣", "흑색", "타르", "짜장"]),
+    "pale": (80, "⚪ 회백색 변: 담즙 흐름 이상 가능성, 진료를 권장합니다.",
+             ["회색", "회백", "흰색", "하얀", "하얗", "창백", "점토"]),
+    "diarrhea": (60, "🚨 설사 경향: 장염 가능성, 수분 보충과 휴식을 취하세요.",
+                 ["묽", "설사", "물똥", "물같", "물처럼", "죽같", "흐물", "질척", "폭포"]),
+    "constipation": (50, "💧 수분 섭취 부족, 섬유질 섭취를 늘리세요!",
+                     ["딱딱", "단단", "토끼똥", "알갱이", "돌같", "굳은", "힘들게", "변비", "잔변"]),
+    "mucus": (40, "🫧 점액 섞임: 장 자극/염증 가능성, 지속되면 상담하세요.",
+              ["점액", "끈적", "콧물같", "젤리"]),
+    "greasy": (30, "🛢️ 기름진/뜨는 변: 지방 흡수 장애 가능성, 기름진 식사를 줄여보세요.",
+               ["기름", "번들", "뜨는", "둥둥", "떠있"]),
+    "odor": (30, "👃 냄새가 심함: 단백질·지방 위주 식단인지 점검해 보세요.",
+             ["악취", "냄새가심", "냄새심", "지독", "고약"]),
+    "green": (20, "🥬 녹색 변: 녹색 채소 섭취나 빠른 장 통과로 흔히 나타납니다.",
+              ["초록", "녹색", "연두"]),
+    "normal": (0, "✅ 정상적인 상태! 건강한 💩입니다.",
+               ["갈색", "황갈", "황금", "바나나", "적당", "부드러", "쾌변"]),
+}
+
+# findings that mean more together than apart: (categories, priority, message)
+COMBOS = [
+    ({"diarrhea", "constipation"}, 70, "🔁 변비와 설사가 함께 나타남: 과민성 장증후군 가능성, 기록을 이어가 보세요."),
+    ({"diarrhea", "mucus"}, 65, "🦠 묽은 변 + 점액: 장 감염/염증 가능성, 증상이 이어지면 진료를 권장합니다."),
+]
+
+UNKNOWN = "🤔 분석이 어렵습니다. 좀 더 자세히 설명해주세요."
+
+
+def normalize(text):
+    return "".join(text.split()).lower()
+
+
+class Matcher:
+    # Aho-Corasick over characters: goto[state] is a dict char -> state, out[state] the
+    # categories whose keywords end at that state (including those reached via fail links)
+    def __init__(self, rules):
+        self.goto = [{}]
+        self.out = [set()]
+        for category, (_, _, keywords) in rules.items():
+            for keyword in keywords:
+                state = 0
+                for ch in normalize(keyword):
+                    nxt = self.goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self.goto)
+                        self.goto[state][ch] = nxt
+                        self.goto.append({})
+                        self.out.append(set())
+                    state = nxt
+                self.out[state].add(category)
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def categories(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        state = 0
+        for ch in normalize(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+MATCHER = Matcher(RULES)
+
+
+def findings(categories):
+    # [(priority, category, message)] sorted by priority; "normal" only when nothing else hit
+    if len(categories) > 1:
+        categories = categories - {"normal"}
+    result = [(RULES[c][0], c, RULES[c][1]) for c in categories]
+    for combo, priority, message in COMBOS:
+        if combo <= categories:
+            result.append((priority, "+".join(sorted(combo)), message))
+    result.sort(key=lambda f: (-f[0], f[1]))
+    return result
+
+
+def classify(text):
+    return findings(MATCHER.categories(text))
+
+
+def classify_batch(texts):
+    # one automaton pass per note; notes with the same normalized text are scanned once
+    seen = {}
+    result = []
+    for text in texts:
+        key = normalize(text)
+        if key not in seen:
+            seen[key] = findings(MATCHER.categories(key))
+        result.append(seen[key])
+    return result
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import numpy as np
+
+from .scoring import READING_KEYS
+
+# ---------------------------
+# Seeded synthetic fleet data
+# ---------------------------
+# every user gets a personal baseline per sensor; visits are baseline + daily noise with
+# occasional spikes (red colour, glucose jumps), timestamps around morning/evening peaks.
+
+GENDERS = ["선택안함", "남성", "여성", "기타"]
+SENSOR_COLORS = ["밝은 노랑", "진한 갈색", "붉은빛", "투명"]
+
+# (baseline low, baseline high, visit noise sd, clip low, clip high)
+SENSOR_MODEL = {
+    "ph": (6.2, 7.6, 0.35, 4.5, 9.0),
+    "protein": (0.05, 0.55, 0.12, 0.0, 1.0),
+    "glucose": (0.0, 0.3, 0.08, 0.0, 1.0),
+    "color_score": (0.05, 0.45, 0.12, 0.0, 1.0),
+    "temp": (36.2, 37.2, 0.3, 34.0, 40.0),
+}
+SPIKE_RATE = 0.01
+
+
+def generate_users(n_users, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "nickname": np.array([f"user{i:06d}" for i in range(n_users)]),
+        "age": rng.integers(18, 90, n_users),
+        "gender": rng.choice(GENDERS, n_users),
+    }
+
+
+def generate_visits(n_users, n_days, visits_per_day=2.0, seed=0, start=datetime(2024, 1, 1)):
+    # returns columns sorted by (user, timestamp); "user" is the 0-based user index
+    rng = np.random.default_rng(seed)
+    per_user = rng.poisson(visits_per_day * n_days, n_users)
+    user = np.repeat(np.arange(n_users), per_user)
+    n = len(user)
+
+    day = rng.integers(0, n_days, n)
+    # two daily peaks (07-09h, 20-22h)
+    hour = np.where(rng.random(n) < 0.5, rng.normal(8, 1, n), rng.normal(21, 1, n)).clip(0, 23.99)
+    offset_us = (day * 86400 + hour * 3600).astype(np.int64) * 1_000_000
+    ts = np.datetime64(start, "us") + offset_us.astype("timedelta64[us]")
+
+    cols = {"user": user, "timestamp": ts}
+    for key in READING_KEYS:
+        lo, hi, sd, clip_lo, clip_hi = SENSOR_MODEL[key]
+        baseline = rng.uniform(lo, hi, n_users)
+        cols[key] = np.round((baseline[user] + rng.normal(0, sd, n)).clip(clip_lo, clip_hi), 2)
+
+    spikes = rng.random(n) < SPIKE_RATE
+    cols["color_score"][spikes] = np.round(rng.uniform(0.85, 1.0, spikes.sum()), 2)
+    jumps = rng.random(n) < SPIKE_RATE
+    cols["glucose"][jumps] = np.round(rng.uniform(0.6, 1.0, jumps.sum()), 2)
+
+    order = np.lexsort((ts, user))
+    return {k: v[order] for k, v in cols.items()}
+
+
+def generate_sensor_batch(n, seed=0):
+    # column batch for scoring.score_batch (pH, 단백질, 당, 색상, 온도)
+    rng = np.random.default_rng(seed)
+    return {
+        "pH": np.round(rng.uniform(5.0, 8.0, n), 2),
+        "단백질": np.round(rng.uniform(0, 3, n), 2),
+        "당": np.round(rng.uniform(0, 2, n), 2),
+        "색상": rng.choice(SENSOR_COLORS, n),
+        "온도(°C)": np.round(rng.uniform(30, 38, n), 1),
+    }
+
+
+def iter_readings(visits, user_ids):
+    # (user_id, reading) pairs for db.log_visits
+    stamps = visits["timestamp"].astype(datetime)
+    values = {k: visits[k].tolist() for k in READING_KEYS}
+    users = visits["user"].tolist()
+    for i in range(len(users)):
+        reading = {k: values[k][i] for k in READING_KEYS}
+        reading["timestamp"] = stamps[i]
+        yield user_ids[users[i]], reading
@@ -0,0 +1,370 @@
+import streamlit as st
+import altair as alt
+from datetime import datetime
+
+from .. import deep_analysis, perf
+from ..badges import RULES as BADGE_RULES
+from ..cache import query_cache
+from ..cohort import WINDOW_DAYS as COHORT_WINDOW_DAYS
+from ..db import (
+    VISIT_PAGE_SIZE, get_user_directory, get_user, create_user, update_user, get_visits_for_user, get_latest_visit,
+    count_visits, get_visit_bounds, get_visit_page, get_visit_rollup, get_alerts, get_badges, get_cohort_rank, sync_external_writes,
+)
+from ..directory import PAGE_SIZE as USER_PAGE_SIZE
+from ..downsample import downsample_long, point_budget
+from ..ingest import emit_event, simulate_raw_reading, stall_event
+from ..rollup import pick_resolution
+from ..scoring import render_report
+
+RAW_DRILLDOWN_DAYS = 92
+# the simulated fingerprint/flush buttons act as one stall of the facility tracker
+WEB_TOILET_ID = "web"
+WEB_FLOOR = "1F"
+
+
+# button clicks inside a fragment rerun just that fragment
+_fragment = st.fragment
+# re-runs on a timer so background job progress shows up without a click; only mounted
+# while a job is running, so idle or finished panels cost nothing
+_poll = st.fragment(run_every=1.0)
+
+
+# ---------------------------
+# Paged visit table
+# ---------------------------
+def _visit_table(user_id, key, columns, start=None, end=None, newest_first=False, limit=VISIT_PAGE_SIZE):
+    # one keyset page at a time; session_state[key] holds the cursors of the pages visited so far
+    # and is reset when the user or range changes. only the picked row's report is rendered.
+    signature = (user_id, start, end)
+    if st.session_state.get(f"{key}_sig") != signature:
+        st.session_state[f"{key}_sig"] = signature
+        st.session_state[key] = [None]
+    cursors = st.session_state[key]
+    page, next_cursor = get_visit_page(user_id, columns + ['report_code'], after=cursors[-1], limit=limit, start=start, end=end, newest_first=newest_first)
+    if page.empty:
+        st.write("방문 기록이 없습니다.")
+        return
+    st.dataframe(page[['timestamp'] + columns])
+
+    col1, col2, col3 = st.columns([1, 1, 4])
+    col1.button("◀ 이전", key=f"{key}_prev", disabled=len(cursors) == 1, on_click=cursors.pop)
+    col2.button("다음 ▶", key=f"{key}_next", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
+    col3.caption(f"{len(cursors)} 페이지")
+
+    rows = {r.visit_id: r for r in page.itertuples()}
+    picked = st.selectbox("리포트 보기", [None] + list(rows), key=f"{key}_report", format_func=lambda v: "선택 안함" if v is None else f"{rows[v].timestamp:%Y-%m-%d %H:%M:%S}")
+    if picked is not None:
+        st.write(render_report(rows[picked].report_code))
+
+
+# ---------------------------
+# Tab: Dashboard (summary)
+# ---------------------------
+def _tab_dashboard(selected_user_id):
+    st.header("대시보드")
+    if selected_user_id == "--새 사용자 생성--":
+        st.info("왼쪽에서 사용자를 생성하거나 선택하세요.")
+    else:
+        u = get_user(selected_user_id)
+        st.subheader(f"안녕하세요, {u['nickname']}님 👋")
+        total = count_visits(selected_user_id)
+        st.metric("총 방문 수", total)
+        if total > 0:
+            last = get_latest_visit(selected_user_id)
+            st.metric("마지막 검사 점수", f"{last['stool_score']}/100")
+            rank = get_cohort_rank(selected_user_id)
+            if rank and rank["visits"]:
+                st.write(f"같은 연령대·성별({rank['cohort']}) 최근 {COHORT_WINDOW_DAYS}일 방문 {rank['visits']}건 대비:")
+                cols = st.columns(3)
+                for col, (label, m) in zip(cols, [("장 건강", "stool_score"), ("수분", "hydrated_score"), ("영양", "nutrition_score")]):
+                    col.metric(label, f"상위 {max(100 - rank[m], 1):.0f}%")
+            st.write("최근 리포트 요약:")
+            st.write(render_report(last["report_code"]))
+        st.markdown("---")
+        st.write("프로필 정보:")
+        st.write({
+            "닉네임": u["nickname"],
+            "나이": u["age"],
+            "성별": u["gender"],
+            "건강 특이사항": u["health_flags"]
+        })
+
+
+# ---------------------------
+# Tab: Visit / Fingerprint (simulate)
+# ---------------------------
+@_fragment
+def _tab_visits(selected_user_id):
+    st.header("🚪 지문 스캔 & 화장실 방문 기록 (시뮬레이션)")
+    if selected_user_id == "--새 사용자 생성--":
+        st.info("사용자를 선택/생성하세요.")
+    else:
+        st.write("지문 인식을 시뮬레이션하려면 버튼을 눌러주세요.")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("지문 인식 (입장)"):
+                st.success("지문 인식 성공 — 입장 허용")
+                st.session_state["in_restroom"] = True
+                st.session_state["enter_time"] = datetime.utcnow()
+                emit_event(stall_event("enter", WEB_TOILET_ID, WEB_FLOOR, selected_user_id))
+        with col2:
+            if st.button("물 내리기 (퇴실 시)"):
+                if not st.session_state.get("in_restroom", False):
+                    st.warning("먼저 지문 인식을 통해 입장해야 합니다.")
+                else:
+                    # flush/exit: the toilet's sensors send a raw event; ingest.py scores and stores it
+                    event = simulate_raw_reading()
+                    event["user_id"] = selected_user_id
+                    event["toilet_id"] = WEB_TOILET_ID
+                    emit_event(stall_event("flush", WEB_TOILET_ID, WEB_FLOOR, selected_user_id))
+                    emit_event(event)
+                    emit_event(stall_event("exit", WEB_TOILET_ID, WEB_FLOOR, selected_user_id))
+                    st.success("센서 데이터 전송 완료 — 수집 서비스가 처리하면 방문 기록에 반영됩니다.")
+                    st.write("센서 요약:")
+                    st.json(event)
+                    # exit
+                    st.session_state["in_restroom"] = False
+                    st.session_state["enter_time"] = None
+
+        # show recent visits preview
+        st.markdown("### 최근 방문 기록 (페이지당 10개)")
+        _visit_table(selected_user_id, "visit_preview", ['stool_score','hydrated_score','nutrition_score'], newest_first=True, limit=10)
+
+
+# ---------------------------
+# Tab: Health Report (analysis)
+# ---------------------------
+def _tab_report(selected_user_id):
+    st.header("🩺 건강 리포트")
+    if selected_user_id == "--새 사용자 생성--":
+        st.info("사용자를 선택/생성하세요.")
+    else:
+        st.markdown("최근 방문 데이터로부터 분석된 리포트를 확인할 수 있습니다.")
+        latest = get_latest_visit(selected_user_id)
+        if latest is None:
+            st.write("방문 기록이 없습니다. (지문 인식 -> 물 내리기 시 센서값이 수집됩니다.)")
+        else:
+            st.subheader("최신 리포트")
+            st.write(f"검사 시간: {latest['timestamp']}")
+            st.metric("장 건강 점수", f"{latest['stool_score']}/100")
+            st.metric("수분 점수", f"{latest['hydrated_score']:.1f}/100")
+            st.metric("영양 점수", f"{latest['nutrition_score']:.1f}/100")
+            st.markdown("**상세 센서 데이터**")
+            st.write({
+                "pH": round(float(latest["ph"]), 2),
+                "단백질": round(float(latest["protein"]), 2),
+                "당(Glucose)": round(float(latest["glucose"]), 2),
+                "색상 이상도": round(float(latest["color_score"]), 2),
+                "온도(°C)": round(float(latest["temp"]), 2)
+            })
+            st.markdown("**맞춤 권고 안내**")
+            st.write(render_report(latest["report_code"]))
+
+            # personal-baseline alerts flagged by the ingestion pipeline
+            alerts = get_alerts(selected_user_id)
+            if not alerts.empty:
+                st.markdown("**개인 기준 대비 이상 신호**")
+                for _, a in alerts.iterrows():
+                    st.warning(f"{a['timestamp']:%Y-%m-%d %H:%M} — {a['message']} (측정 {a['value']:.2f}, 평소 {a['baseline']:.2f})")
+
+            # "심층분석" runs on the background worker; results are cached per visit_id
+            deep_status, value = deep_analysis.status(latest["visit_id"])
+            if deep_status in (None, "failed") and st.button("심층 AI 분석(시뮬레이션)"):
+                deep_analysis.submit(latest.to_dict())
+                deep_status, value = deep_analysis.status(latest["visit_id"])
+            _deep_analysis_panel(latest["visit_id"], deep_status, value)
+
+
+def _deep_analysis_panel(visit_id, deep_status, value):
+    if deep_status == "running":
+        _deep_analysis_progress(visit_id)
+    elif deep_status == "failed":
+        st.error(f"심층 분석 실패: {value}")
+    elif deep_status == "done":
+        st.markdown("**심층 AI 분석 결과**")
+        for p in value:
+            st.write("- " + p)
+
+
+@_poll
+def _deep_analysis_progress(visit_id):
+    deep_status, value = deep_analysis.status(visit_id)
+    if deep_status != "running":
+        # finished: rerun the page once so the result is drawn outside the timer
+        st.rerun()
+    st.progress(value, text="심층 분석 중... (백그라운드)")
+
+
+# ---------------------------
+# Tab: Time-range Graphs
+# ---------------------------
+def _tab_graph(selected_user_id):
+    st.header("📈 기간별 건강 변화 보기")
+    if selected_user_id == "--새 사용자 생성--":
+        st.info("사용자를 선택/생성하세요.")
+    else:
+        bounds = get_visit_bounds(selected_user_id)
+        if bounds is None:
+            st.write("방문 기록이 없습니다.")
+        else:
+            # date pickers
+            min_date = bounds[0].date()
+            max_date = bounds[1].date()
+            col1, col2 = st.columns(2)
+            with col1:
+                start_date = st.date_input("시작일", value=min_date, min_value=min_date, max_value=max_date)
+            with col2:
+                end_date = st.date_input("종료일", value=max_date, min_value=min_date, max_value=max_date)
+            if start_date > end_date:
+                st.error("시작일은 종료일보다 이전이어야 합니다.")
+            else:
+                start_dt = datetime.combine(start_date, datetime.min.time())
+                end_dt = datetime.combine(end_date, datetime.max.time())
+                # long ranges read the daily/weekly rollup instead of every raw visit;
+                # short ranges can drill back down to every raw visit
+                resolution = pick_resolution(start_dt, end_dt)
+                show_raw = False
+                if (end_date - start_date).days < RAW_DRILLDOWN_DAYS:
+                    show_raw = st.checkbox("원시 데이터 전체 보기 (다운샘플링 없음)")
+                if show_raw:
+                    resolution = "raw"
+                if resolution == "raw":
+                    sel = get_visits_for_user(selected_user_id, start=start_dt, end=end_dt, columns=['timestamp', 'stool_score', 'hydrated_score', 'nutrition_score'])
+                else:
+                    sel = get_visit_rollup(selected_user_id, start_dt, end_dt, resolution)
+                if sel.empty:
+                    st.write("해당 기간의 데이터가 없습니다.")
+                else:
+                    # already typed and sorted by timestamp in the store
+                    df = sel
+                    if resolution != "raw":
+                        st.caption(f"{'일별' if resolution == 'day' else '주별'} 평균 ({len(df)}개 구간)")
+                    # melt for charting, capped to the chart's point budget per series
+                    metrics = ['stool_score','hydrated_score','nutrition_score']
+                    if show_raw:
+                        plot_df = df[['timestamp'] + metrics].melt('timestamp', var_name='metric', value_name='value')
+                    else:
+                        plot_df = downsample_long(df, 'timestamp', metrics, point_budget())
+                    chart = alt.Chart(plot_df).mark_line(point=True).encode(
+                        x='timestamp:T',
+                        y='value:Q',
+                        color='metric:N',
+                        tooltip=['timestamp:T','metric:N','value:Q']
+                    ).interactive()
+                    with perf.timer("chart.altair"):
+                        st.altair_chart(chart, use_container_width=True)
+                    if resolution == "raw":
+                        st.markdown("원시 표")
+                        _visit_table(selected_user_id, "graph_table", ['stool_score','hydrated_score','nutrition_score'], start=start_dt, end=end_dt)
+                    else:
+                        st.markdown("집계 표")
+                        st.dataframe(df)
+
+
+# ---------------------------
+# Tab: Badges / Gamification
+# ---------------------------
+def _tab_badges(selected_user_id):
+    st.header("🏅 뱃지 및 성취")
+    if selected_user_id == "--새 사용자 생성--":
+        st.info("사용자를 선택/생성하세요.")
+    else:
+        badges_df = get_badges(selected_user_id)
+        if badges_df.empty:
+            st.write("아직 획득한 뱃지가 없습니다. 규칙적으로 사용해보세요!")
+        else:
+            st.write("획득한 뱃지:")
+            st.dataframe(badges_df)
+        st.markdown("획득 가능한 뱃지 예시:")
+        for rule in BADGE_RULES:
+            st.write(f"- {rule.name}: {rule.description}")
+
+
+TABS = {
+    "대시보드": ("dashboard", _tab_dashboard),
+    "방문 기록(지문 시뮬레이션)": ("visits", _tab_visits),
+    "건강 리포트(분석)": ("report", _tab_report),
+    "기간별 그래프": ("graph", _tab_graph),
+    "뱃지/성과": ("badges", _tab_badges),
+}
+
+
+def render():
+    st.header("🚻 스마트 화장실 건강 관리")
+
+    # visits are written by the ingestion service (toilet_app.ingest); pick up its writes
+    sync_external_writes()
+
+    # sidebar: user selection / create
+    st.sidebar.header("사용자 관리")
+    with perf.timer("sidebar.get_users"):
+        directory = get_user_directory()
+
+    # nickname prefix search + paging: only one page of users becomes selectbox options
+    query = st.sidebar.text_input("닉네임 검색", key="user_search")
+    n_pages = max(1, -(-directory.count(query) // USER_PAGE_SIZE))
+    if st.session_state.get("user_page", 1) > n_pages:
+        st.session_state["user_page"] = n_pages
+    page = st.sidebar.number_input("페이지", min_value=1, max_value=n_pages, value=1, key="user_page") if n_pages > 1 else 1
+    options = ["--새 사용자 생성--"] + directory.search(query, offset=(int(page) - 1) * USER_PAGE_SIZE, limit=USER_PAGE_SIZE)
+    # keep the current selection available while browsing other pages/searches
+    current = st.session_state.get("selected_user_id")
+    if current in directory and current not in options:
+        options.insert(1, current)
+
+    selected_user_id = st.sidebar.selectbox("사용자 선택", options=options, key="selected_user_id", format_func=lambda x: "--- 새 사용자 생성 ---" if x == "--새 사용자 생성--" else directory.nickname(x))
+
+    if selected_user_id == "--새 사용자 생성--":
+        st.sidebar.markdown("### 새 사용자 등록")
+        nickname = st.sidebar.text_input("닉네임")
+        age = st.sidebar.number_input("나이", min_value=1, max_value=120, value=25)
+        gender = st.sidebar.selectbox("성별", options=["선택안함","남성","여성","기타"])
+        health_flags = st.sidebar.multiselect("건강 특이사항 (선택)", options=["알레르기", "만성질환", "임신", "기저질환(간/신장 등)", "특이사항 없음"])
+        if st.sidebar.button("등록"):
+            if not nickname.strip():
+                st.sidebar.error("닉네임을 입력하세요.")
+            else:
+                user_id = create_user(nickname.strip(), int(age), gender, health_flags or ["특이사항 없음"])
+                st.sidebar.success("사용자 등록 완료.")
+                st.rerun()
+    else:
+        user = get_user(selected_user_id)
+        if user:
+            st.sidebar.markdown(f"**선택된 사용자:** {user['nickname']}  (나이: {user['age']}, 성별: {user['gender']})")
+            if st.sidebar.button("프로필 편집"):
+                # Quick edit modal area in main
+                st.session_state["edit_user"] = selected_user_id
+
+    cache_stats = query_cache.stats()
+    st.sidebar.caption(f"쿼리 캐시: hit {cache_stats['hits']} / miss {cache_stats['misses']} ({cache_stats['hit_rate']:.0%})")
+
+    # Main tabs: only the selected tab's body runs; the others are not queried or rendered
+    tab = st.radio("보기", list(TABS), horizontal=True, key="health_tab", label_visibility="collapsed")
+    with perf.timer(f"tab.{TABS[tab][0]}"):
+        TABS[tab][1](selected_user_id)
+
+    # ---------------------------
+    # Inline: Profile edit modal (simple)
+    # ---------------------------
+    if st.session_state.get("edit_user"):
+        edit_id = st.session_state["edit_user"]
+        u = get_user(edit_id)
+        if u:
+            st.markdown("---")
+            st.subheader("프로필 편집")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                new_nick = st.text_input("닉네임", value=u["nickname"])
+            with col2:
+                new_age = st.number_input("나이", min_value=1, max_value=120, value=int(u["age"]))
+            with col3:
+                new_gender = st.selectbox("성별", options=["선택안함","남성","여성","기타"], index=["선택안함","남성","여성","기타"].index(u["gender"]) if u["gender"] in ["선택안함","남성","여성","기타"] else 0)
+                new_flags = st.multiselect("건강 특이사항", options=["알레르기", "만성질환", "임신", "기저질환(간/신장 등)", "특이사항 없음"], default=u["health_flags"].split(","))
+            if st.button("저장"):
+                update_user(edit_id, new_nick, int(new_age), new_gender, new_flags)
+                st.success("프로필이 업데이트되었습니다.")
+                st.session_state["edit_user"] = None
+                st.rerun()
+            if st.button("취소"):
+                st.session_state["edit_user"] = None
+                st.rerun()
@@ -0,0 +1,32 @@
+import pandas as pd
+import streamlit as st
+
+from .. import perf
+from ..cache import query_cache
+
+
+def render():
+    st.header("⏱️ 성능 패널")
+    st.caption("rerun·탭·쿼리별 지연 시간 분포 (이 서버 프로세스 기준)")
+
+    on = st.checkbox("계측 켜기", value=perf.enabled())
+    if on != perf.enabled():
+        perf.enable(on)
+    if st.button("측정값 초기화"):
+        perf.reset()
+
+    rows, counters = perf.snapshot()
+    if not rows:
+        st.info("아직 수집된 측정값이 없습니다. 계측을 켜고 다른 페이지를 사용해 보세요.")
+    else:
+        df = pd.DataFrame(rows).set_index("name")
+        st.dataframe(df.style.format({c: "{:.2f}" for c in df.columns if c.endswith("_ms")}))
+        col1, col2 = st.columns(2)
+        col1.download_button("CSV 내보내기", perf.to_csv(), file_name="perf.csv", mime="text/csv")
+        col2.download_button("JSON 내보내기", perf.to_json(), file_name="perf.json", mime="application/json")
+
+    st.subheader("쿼리 캐시")
+    st.write(query_cache.stats())
+    if counters:
+        st.subheader("카운터")
+        st.write(counters)
@@ -0,0 +1,41 @@
+import random
+
+import pandas as pd
+import streamlit as st
+
+from ..scoring import analyze_sensor_data
+
+
+def render():
+    st.header("🧪 변기 내 센서 데이터 수집 및 AI 분석")
+
+    st.write("센서 데이터 예시 (pH, 단백질, 당, 색상, 온도 등):")
+
+    # 센서 데이터 시뮬레이션
+    sensor_data = {
+        "pH": round(random.uniform(5.0, 8.0), 2),
+        "단백질": round(random.uniform(0, 3), 2),
+        "당": round(random.uniform(0, 2), 2),
+        "색상": random.choice(["밝은 노랑", "진한 갈색", "붉은빛", "투명"]),
+        "온도(°C)": round(random.uniform(30, 38), 1),
+    }
+
+    df = pd.DataFrame([sensor_data])
+    st.dataframe(df)
+
+    scores, total, advices = analyze_sensor_data(sensor_data)
+
+    st.subheader("AI 분석 결과")
+    st.metric("💩 종합 건강 지수", f"{total:.1f}/100")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("장 건강", scores["장 건강"])
+    col2.metric("수분 상태", scores["수분 상태"])
+    col3.metric("영양 상태", scores["영양 상태"])
+
+    st.subheader("🔍 맞춤형 건강 리포트")
+    if advices:
+        for tip in advices:
+            st.write(tip)
+    else:
+        st.success("✅ 전반적으로 건강한 상태입니다!")
@@ -0,0 +1,20 @@
+import streamlit as st
+
+from .. import stool_text
+
+
+def render():
+    st.header("🤖 AI가 분석하는 💩 건강 상태")
+
+    st.write("오늘의 💩 사진을 업로드하세요 (샘플로 텍스트 입력 사용).")
+    stool_description = st.text_area("💩 상태를 설명해주세요 (예: 딱딱함, 색깔, 냄새 등)")
+
+    if st.button("AI 분석하기"):
+        # 키워드 사전 기반 분석: 해당하는 소견을 우선순위 순으로 모두 표시
+        found = stool_text.classify(stool_description)
+        if not found:
+            st.success(f"AI 분석 결과: {stool_text.UNKNOWN}")
+        else:
+            st.success(f"AI 분석 결과: {found[0][2]}")
+            for _, _, message in found[1:]:
+                st.info(message)
@@ -0,0 +1,24 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def render():
+    st.header("📈 💩 건강 추이 리포트")
+    st.write("날짜 범위를 선택하고 장기 변화를 확인하세요.")
+
+    start_date = st.date_input("시작일", datetime.date.today() - datetime.timedelta(days=14))
+    end_date = st.date_input("종료일", datetime.date.today())
+
+    if st.button("리포트 보기"):
+        days = (end_date - start_date).days + 1
+        dates = pd.date_range(start_date, end_date)
+        health_scores = np.random.randint(50, 100, days)
+
+        df = pd.DataFrame({"날짜": dates, "💩건강지수": health_scores})
+        st.line_chart(df.set_index("날짜"))
+
+        avg_score = np.mean(health_scores)
+        st.metric("평균 💩건강지수", f"{avg_score:.1f}/100")
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from ..db import get_facility_stats, get_floor_stats
+from ..stalls import DWELL_LABELS, WINDOW
+
+# live numbers come from the ingest service's stall tracker (see stalls.py / ingest.py);
+# this page only reads its latest snapshot
+STALE_AFTER = 60
+
+
+def _rate(stats):
+    return "-" if stats["flush_rate"] is None else f"{stats['flush_rate'] * 100:.1f}%"
+
+
+def _dwell(stats):
+    return "-" if stats["mean_dwell"] is None else f"{stats['mean_dwell'] / 60:.1f}분"
+
+
+def render():
+    st.header("🚻 화장실 방문 기록")
+
+    found = get_facility_stats()
+    if found is None:
+        st.info("아직 집계된 데이터가 없습니다. 수집 서비스(python -m toilet_app.ingest)를 실행하세요.")
+        return
+    facility, updated_at = found
+    age = (datetime.utcnow() - updated_at).total_seconds()
+    st.caption(f"최근 {WINDOW // 60}분 기준 · {age:.0f}초 전 갱신")
+    if age > STALE_AFTER:
+        st.warning("수집 서비스의 갱신이 멈춘 것 같습니다. 서비스 상태를 확인하세요.")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("사용 중인 칸", f"{facility['occupied']} / {facility['stalls']}")
+    col2.metric("방문 수", facility["visits"])
+    col3.metric("평균 이용 시간", _dwell(facility))
+    col4.metric("변기 물 내림 성공률", _rate(facility))
+
+    st.markdown("#### 이용 시간 분포")
+    st.bar_chart(pd.DataFrame({"방문 수": facility["dwell_hist"]}, index=pd.Index(DWELL_LABELS, name="이용 시간")))
+
+    floors = get_floor_stats()
+    if floors:
+        st.markdown("#### 층별 현황")
+        st.dataframe(pd.DataFrame([
+            {
+                "층": floor,
+                "사용 중": f"{s['occupied']} / {s['stalls']}",
+                "방문 수": s["visits"],
+                "평균 이용 시간": _dwell(s),
+                "물 내림 성공률": _rate(s),
+            }
+            for floor, s in floors.items()
+        ]))
+
+    toilet_id = st.text_input("칸 번호로 조회 (예: T00042)")
+    if toilet_id.strip():
+        found = get_facility_stats(f"stall:{toilet_id.strip()}")
+        if found is None:
+            st.write("해당 칸의 기록이 없습니다.")
+        else:
+            s = found[0]
+            st.write({
+                "층": s["floor"],
+                "상태": "사용 중" if s["occupied"] else "비어 있음",
+                "방문 수": s["visits"],
+                "평균 이용 시간": _dwell(s),
+                "물 내림 성공률": _rate(s),
+            })
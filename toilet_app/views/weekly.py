@@ -0,0 +1,18 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def render():
+    st.header("📊 최근 건강 리포트 요약")
+
+    # 최근 7일 데이터 시뮬레이션
+    dates = pd.date_range(datetime.date.today() - datetime.timedelta(days=6), datetime.date.today())
+    health_scores = np.random.randint(60, 100, size=7)
+    df = pd.DataFrame({"날짜": dates, "건강지수": health_scores})
+
+    st.line_chart(df.set_index("날짜"))
+    avg_score = np.mean(health_scores)
+    st.metric("최근 7일 평균 건강지수", f"{avg_score:.1f}/100")